@@ -46,10 +46,13 @@ def _GetAliasForIdentifier(identifier, alias_map):
     Returns:
       The aliased symbol name or None if not found.
     """
-    ns = identifier.split('.', 1)[0]
-    aliased_symbol = alias_map.get(ns)
+    dot_index = identifier.find('.')
+    if dot_index < 0:
+        return alias_map.get(identifier) or None
+
+    aliased_symbol = alias_map.get(identifier[:dot_index])
     if aliased_symbol:
-        return aliased_symbol + identifier[len(ns):]
+        return aliased_symbol + identifier[dot_index:]
 
 
 def _SetTypeAlias(js_type, alias_map):
@@ -59,11 +62,54 @@ def _SetTypeAlias(js_type, alias_map):
       js_type: A typeannotation.TypeAnnotation instance.
       alias_map: A dictionary mapping a symbol to an alias.
     """
-    aliased_symbol = _GetAliasForIdentifier(js_type.identifier, alias_map)
-    if aliased_symbol:
-        js_type.alias = aliased_symbol
-    for sub_type in js_type.IterTypes():
-        _SetTypeAlias(sub_type, alias_map)
+    # Walk nested types with an explicit stack instead of recursing.
+    types = [js_type]
+    while types:
+        js_type = types.pop()
+        aliased_symbol = _GetAliasForIdentifier(js_type.identifier, alias_map)
+        if aliased_symbol:
+            js_type.alias = aliased_symbol
+        types.extend(js_type.IterTypes())
+
+
+def _MarkIdentifierAlias(token, alias_map):
+    """Marks an identifier token that uses an alias with the original symbol.
+
+    Args:
+      token: A SIMPLE_LVALUE or IDENTIFIER token.
+      alias_map: A dictionary mapping a symbol to an alias.
+    """
+    identifier = tokenutil.GetIdentifierForToken(token)
+    if identifier:
+        aliased_symbol = _GetAliasForIdentifier(identifier, alias_map)
+        if aliased_symbol:
+            token.metadata.aliased_symbol = aliased_symbol
+
+
+def _MarkDocFlagTypeAlias(token, alias_map):
+    """Updates the alias for identifiers in the type of a doc flag token.
+
+    Args:
+      token: A DOC_FLAG token.
+      alias_map: A dictionary mapping a symbol to an alias.
+    """
+    flag = token.attached_object
+    if flag and flag.HasType() and flag.jstype:
+        _SetTypeAlias(flag.jstype, alias_map)
+
+
+# Marks a context in the block that was already checked for aliases.  It is
+# truthy, like the True marking every other context in the block.
+_SEEN_CONTEXT = object()
+
+
+# Functions marking aliases, by the type of token they apply to.  Tokens of
+# any other type never refer to an alias.
+_ALIAS_MARKERS = {
+    javascripttokens.JavaScriptTokenType.SIMPLE_LVALUE: _MarkIdentifierAlias,
+    javascripttokens.JavaScriptTokenType.IDENTIFIER: _MarkIdentifierAlias,
+    javascripttokens.JavaScriptTokenType.DOC_FLAG: _MarkDocFlagTypeAlias,
+}
 
 
 class AliasPass(object):
@@ -104,39 +150,53 @@ class AliasPass(object):
             return
 
         # TODO(nnaze): Add more goog.scope usage checks.
-        self._CheckGoogScopeCalls(start_token)
+        has_goog_scope = self._CheckGoogScopeCalls(start_token)
 
         # If we have closurized namespaces, identify aliased identifiers.
         if self._closurized_namespaces:
             context = start_token.metadata.context
             root_context = context.GetRoot()
-            self._ProcessRootContext(root_context)
+            self._ProcessRootContext(root_context, has_goog_scope)
 
     def _CheckGoogScopeCalls(self, start_token):
-        """Check goog.scope calls for lint/usage errors."""
+        """Check goog.scope calls for lint/usage errors.
 
-        def IsScopeToken(token):
-            return (token.type is javascripttokens.JavaScriptTokenType.IDENTIFIER and
-                    token.string == 'goog.scope')
+        Args:
+          start_token: The first token in the stream.
+
+        Returns:
+          Whether the stream contains any goog.scope call.
+        """
 
-        # Find all the goog.scope tokens in the file
-        scope_tokens = [t for t in start_token if IsScopeToken(t)]
+        identifier_type = javascripttokens.JavaScriptTokenType.IDENTIFIER
+        statement_type = ecmametadatapass.EcmaContext.STATEMENT
+        root_type = ecmametadatapass.EcmaContext.ROOT
 
-        for token in scope_tokens:
-            scope_context = token.metadata.context
+        # Walk the file once, checking each goog.scope token as it is found.
+        scope_count = 0
+        token = start_token
+        while token:
+            if token.type is identifier_type and token.string == 'goog.scope':
+                scope_context = token.metadata.context
 
-            if not (scope_context.type == ecmametadatapass.EcmaContext.STATEMENT and
-                    scope_context.parent.type == ecmametadatapass.EcmaContext.ROOT):
-                self._MaybeReportError(
-                    error.Error(errors.INVALID_USE_OF_GOOG_SCOPE,
-                                'goog.scope call not in global scope', token))
+                if not (scope_context.type is statement_type and
+                        scope_context.parent.type is root_type):
+                    self._MaybeReportError(
+                        error.Error(errors.INVALID_USE_OF_GOOG_SCOPE,
+                                    'goog.scope call not in global scope', token))
 
-        # There should be only one goog.scope reference.  Register errors for
-        # every instance after the first.
-        for token in scope_tokens[1:]:
-            self._MaybeReportError(
-                error.Error(errors.EXTRA_GOOG_SCOPE_USAGE,
-                            'More than one goog.scope call in file.', token))
+                # There should be only one goog.scope reference.  Register errors
+                # for every instance after the first.
+                if scope_count:
+                    self._MaybeReportError(
+                        error.Error(errors.EXTRA_GOOG_SCOPE_USAGE,
+                                    'More than one goog.scope call in file.',
+                                    token))
+                scope_count += 1
+
+            token = token.next
+
+        return scope_count > 0
 
     def _MaybeReportError(self, err):
         """Report an error to the handler (if registered)."""
@@ -146,76 +206,152 @@ class AliasPass(object):
     @classmethod
     def _YieldAllContexts(cls, context):
         """Yields all contexts that are contained by the given context."""
-        yield context
-        for child_context in context.children:
-            for descendent_child in cls._YieldAllContexts(child_context):
-                yield descendent_child
+        # Walk with an explicit stack rather than nested generators.  Children
+        # are pushed in reverse so they are yielded in document order.
+        stack = [context]
+        while stack:
+            context = stack.pop()
+            yield context
+            stack.extend(reversed(context.children))
 
     @staticmethod
-    def _IsTokenInParentBlock(token, parent_block):
-        """Determines whether the given token is contained by the given block.
+    def _IsContextInBlock(context, parent_block, block_contexts):
+        """Determines whether the given context is contained by the given block.
+
+        Every context visited on the way up shares the answer, so all of them
+        are recorded in block_contexts and later lookups stop as soon as they
+        reach one of them.
 
         Args:
-          token: A token
+          context: An EcmaContext.
           parent_block: An EcmaContext.
+          block_contexts: A dict mapping the id() of already visited contexts
+              to whether they are contained by parent_block.
 
         Returns:
-          Whether the token is in a context that is or is a child of the given
-          parent_block context.
+          Whether the context is or is a child of the given parent_block context.
         """
-        context = token.metadata.context
-
+        visited_ids = []
+        in_block = False
         while context:
+            context_id = id(context)
+            if context_id in block_contexts:
+                in_block = bool(block_contexts[context_id])
+                break
             if context is parent_block:
-                return True
+                in_block = True
+                break
+            visited_ids.append(context_id)
             context = context.parent
 
-        return False
+        for context_id in visited_ids:
+            block_contexts[context_id] = in_block
+
+        return in_block
+
+    @staticmethod
+    def _IsGoogScopeBlock(context, goog_scope_blocks):
+        """Whether the given context is a goog.scope block, computed once.
+
+        Args:
+          context: An EcmaContext.
+          goog_scope_blocks: A dict mapping the id() of already checked contexts
+              to whether they are goog.scope blocks.
+
+        Returns:
+          Whether the context is a goog.scope block.
+        """
+        context_id = id(context)
+        is_goog_scope_block = goog_scope_blocks.get(context_id)
+        if is_goog_scope_block is None:
+            is_goog_scope_block = scopeutil.IsGoogScopeBlock(context)
+            goog_scope_blocks[context_id] = is_goog_scope_block
+        return is_goog_scope_block
+
+    def _ProcessRootContext(self, root_context, has_goog_scope=True):
+        """Processes all goog.scope blocks under the root context.
 
-    def _ProcessRootContext(self, root_context):
-        """Processes all goog.scope blocks under the root context."""
+        Args:
+          root_context: The root EcmaContext.
+          has_goog_scope: Whether the file contains any goog.scope call.
+        """
 
         assert root_context.type is ecmametadatapass.EcmaContext.ROOT
 
         # Process aliases in statements in the root scope for goog.module-style
         # aliases.
+        statement_type = ecmametadatapass.EcmaContext.STATEMENT
+        var_type = ecmametadatapass.EcmaContext.VAR
+        match_module_alias = scopeutil.MatchModuleAlias
+        is_in_closurized_namespace = scopeutil.IsInClosurizedNamespace
+        closurized_namespaces = self._closurized_namespaces
+
         global_alias_map = {}
         for context in root_context.children:
-            if context.type == ecmametadatapass.EcmaContext.STATEMENT:
+            if context.type is statement_type:
                 for statement_child in context.children:
-                    if statement_child.type == ecmametadatapass.EcmaContext.VAR:
-                        match = scopeutil.MatchModuleAlias(statement_child)
+                    if statement_child.type is var_type:
+                        match = match_module_alias(statement_child)
                         if match:
                             # goog.require aliases cannot use further aliases, the symbol is
                             # the second part of match, directly.
                             symbol = match[1]
-                            if scopeutil.IsInClosurizedNamespace(symbol,
-                                                                 self._closurized_namespaces):
+                            if is_in_closurized_namespace(symbol,
+                                                          closurized_namespaces):
                                 global_alias_map[match[0]] = symbol
 
+        # Without goog.scope blocks or goog.module-style aliases there is
+        # nothing to mark, so skip walking the blocks.
+        if not has_goog_scope and not global_alias_map:
+            return
+
+        # Whether a block is a goog.scope block, by id() of the block context.
+        # Every var statement in a block asks, so answer only once per block.
+        goog_scope_blocks = {}
+
         # Process each block to find aliases.
         for context in root_context.children:
-            self._ProcessBlock(context, global_alias_map)
+            self._ProcessBlock(context, global_alias_map, goog_scope_blocks)
+
+    def _ProcessBlock(self, context, global_alias_map, goog_scope_blocks):
+        """Scans a goog.scope block to find aliases and mark alias tokens.
 
-    def _ProcessBlock(self, context, global_alias_map):
-        """Scans a goog.scope block to find aliases and mark alias tokens."""
-        alias_map = global_alias_map.copy()
+        Args:
+          context: The EcmaContext of the block.
+          global_alias_map: A dictionary mapping a symbol to an alias, for
+              aliases defined in the root scope.
+          goog_scope_blocks: A dict mapping the id() of already checked block
+              contexts to whether they are goog.scope blocks.
+        """
+        # Most blocks define no aliases of their own, so only copy the global
+        # map once the block adds to it.
+        alias_map = global_alias_map
 
         # Iterate over every token in the context. Each token points to one
         # context, but multiple tokens may point to the same context. We only want
-        # to check each context once, so keep track of those we've seen.
-        seen_contexts = set()
+        # to check each context once, so keep track of those we've seen. Contexts
+        # are tracked by id() in the same dict that records whether they are in
+        # the block.
+        block_contexts = {}
+        get_alias_marker = _ALIAS_MARKERS.get
         token = context.start_token
-        while token and self._IsTokenInParentBlock(token, context):
-            token_context = token.metadata.context if token.metadata else None
+        while token:
+            token_context = token.metadata.context
+            in_block = block_contexts.get(id(token_context))
+            if in_block is None:
+                in_block = self._IsContextInBlock(token_context, context,
+                                                  block_contexts)
+            if not in_block:
+                break
 
             # Check to see if this token is an alias.
-            if token_context and token_context not in seen_contexts:
-                seen_contexts.add(token_context)
+            if in_block is not _SEEN_CONTEXT:
+                block_contexts[id(token_context)] = _SEEN_CONTEXT
 
                 # If this is a alias statement in the goog.scope block.
-                if (token_context.type == ecmametadatapass.EcmaContext.VAR and
-                    scopeutil.IsGoogScopeBlock(token_context.parent.parent)):
+                if (token_context.type is ecmametadatapass.EcmaContext.VAR and
+                    self._IsGoogScopeBlock(token_context.parent.parent,
+                                           goog_scope_blocks)):
                     match = scopeutil.MatchAlias(token_context)
 
                     # If this is an alias, remember it in the map.
@@ -224,21 +360,14 @@ class AliasPass(object):
                         symbol = _GetAliasForIdentifier(symbol, alias_map) or symbol
                         if scopeutil.IsInClosurizedNamespace(symbol,
                                                              self._closurized_namespaces):
+                            if alias_map is global_alias_map:
+                                alias_map = global_alias_map.copy()
                             alias_map[alias] = symbol
 
-            # If this token is an identifier that matches an alias,
-            # mark the token as an alias to the original symbol.
-            if (token.type is javascripttokens.JavaScriptTokenType.SIMPLE_LVALUE or
-                token.type is javascripttokens.JavaScriptTokenType.IDENTIFIER):
-                identifier = tokenutil.GetIdentifierForToken(token)
-                if identifier:
-                    aliased_symbol = _GetAliasForIdentifier(identifier, alias_map)
-                    if aliased_symbol:
-                        token.metadata.aliased_symbol = aliased_symbol
-
-            elif token.type == javascripttokens.JavaScriptTokenType.DOC_FLAG:
-                flag = token.attached_object
-                if flag and flag.HasType() and flag.jstype:
-                    _SetTypeAlias(flag.jstype, alias_map)
+            # If this token is an identifier or a doc flag type that matches an
+            # alias, mark it as an alias to the original symbol.
+            mark_alias = get_alias_marker(token.type)
+            if mark_alias:
+                mark_alias(token, alias_map)
 
             token = token.next  # Get next token
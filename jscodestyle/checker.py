@@ -20,7 +20,14 @@
 from jscodestyle import aliaspass
 from jscodestyle import checkerbase
 from jscodestyle import closurizednamespacesinfo
+from jscodestyle import error_fixer
 from jscodestyle import javascriptlintrules
+from jscodestyle.javascripttokens import JavaScriptTokenType
+
+
+# Calls whose lint checks depend on the dependency information of the whole
+# file.
+_DEPENDENCY_STATEMENTS = frozenset(['goog.provide', 'goog.require'])
 
 
 class JavaScriptStyleChecker(checkerbase.CheckerBase):
@@ -102,22 +109,77 @@ class JavaScriptStyleChecker(checkerbase.CheckerBase):
         # is displayed, don't run the dependency pass if a parse error exists.
         if self.namespaces_info:
             self.namespaces_info.Reset()
-            self._ExecutePass(start_token, self._DependencyPass, stop_token)
 
-        self._ExecutePass(start_token, self._LintPass, stop_token)
+            # Only the lint pass (through the error fixer) adds or deletes tokens,
+            # so the walks before it can share one list of the tokens.
+            tokens = _GetTokenList(start_token)
+
+            # The goog.provide and goog.require lint checks need the dependency
+            # information for the whole file, so the dependency pass has to run
+            # first.  Without those statements nothing in the lint pass depends
+            # on tokens further on, so both can share a single walk.  The error
+            # fixer edits tokens during the lint pass, so when fixing, the
+            # dependency pass must see the original tokens first.
+            if (isinstance(self._error_handler, error_fixer.ErrorFixer) or
+                    _HasDependencyStatements(tokens)):
+                self._ExecutePassOverTokens(
+                    tokens, self.namespaces_info.ProcessToken, stop_token)
+                self._ExecutePass(start_token, self._lint_rules.CheckToken,
+                                  stop_token)
+            else:
+                self._ExecutePass(start_token, self._DependencyAndLintPass,
+                                  stop_token)
+        else:
+            self._ExecutePass(start_token, self._lint_rules.CheckToken,
+                              stop_token)
 
         # If we have a stop_token, we didn't end up reading the whole file and,
         # thus, don't call Finalize to do end-of-file checks.
         if not stop_token:
             self._lint_rules.Finalize(self._state_tracker)
 
-    def _DependencyPass(self, token):
-        """Processes an individual token for dependency information.
+    def _DependencyAndLintPass(self, token, state_tracker):
+        """Processes an individual token for dependency information and lint.
 
-        Used to encapsulate the logic needed to process an individual token so that
-        it can be passed to _ExecutePass.
+        Used when the dependency and lint passes can share one walk over the
+        token stream.
 
         Args:
           token: The token to process.
+          state_tracker: The JavaScript state tracker.
         """
-        self.namespaces_info.ProcessToken(token, self._state_tracker)
+        self.namespaces_info.ProcessToken(token, state_tracker)
+        self._lint_rules.CheckToken(token, state_tracker)
+
+
+def _GetTokenList(start_token):
+    """Returns a list of all the tokens in the token stream.
+
+    Args:
+      start_token: The first token in the token stream.
+
+    Returns:
+      A list of the tokens, in order.
+    """
+    tokens = []
+    token = start_token
+    while token:
+        tokens.append(token)
+        token = token.next
+    return tokens
+
+
+def _HasDependencyStatements(tokens):
+    """Returns whether the tokens include goog.provide or goog.require calls.
+
+    Args:
+      tokens: A list of the tokens in the token stream.
+
+    Returns:
+      True if any identifier token is a goog.provide or goog.require call.
+    """
+    for token in tokens:
+        if (token.type is JavaScriptTokenType.IDENTIFIER and
+                token.string in _DEPENDENCY_STATEMENTS):
+            return True
+    return False
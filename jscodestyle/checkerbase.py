@@ -21,9 +21,23 @@ from jscodestyle import errors
 from jscodestyle.common import error
 
 
+# Errors that are only reported when the jsdoc flag is set.
+_MISSING_DOC_ERRORS = frozenset([
+    errors.MISSING_PARAMETER_DOCUMENTATION,
+    errors.MISSING_RETURN_DOCUMENTATION,
+    errors.MISSING_MEMBER_DOCUMENTATION,
+    errors.MISSING_PRIVATE,
+    errors.MISSING_JSDOC_TAG_THIS])
+
+
 class LintRulesBase(object):
     """Base class for all classes defining the lint rules for a language."""
 
+    # One instance checks each file, and its attributes are read for every
+    # token, so subclasses declare their attributes as slots as well.
+    __slots__ = ('error_handler', '_limited_doc_checks', '_is_html', 'jsdoc',
+                 'disable', '_disabled_error_nums', '_report_filter')
+
     def __init__(self,
                  error_handler,
                  limited_doc_checks,
@@ -45,10 +59,27 @@ class LintRulesBase(object):
         self.jsdoc = jsdoc
         self.disable = disable
 
+        # Parse the disabled error codes once, not for every reported error.
+        disabled_error_nums = set()
+        for error_str in disable or []:
+            try:
+                disabled_error_nums.add(int(error_str))
+            except ValueError:
+                pass
+        self._disabled_error_nums = frozenset(disabled_error_nums)
+
+        # Without disabled errors, use a cheaper check giving the same answer.
+        if self._disabled_error_nums:
+            self._report_filter = self.should_report_error
+        elif jsdoc:
+            self._report_filter = self._should_report_any_error
+        else:
+            self._report_filter = self._should_report_documented_error
+
     def _HandleError(self, code, message, token, position=None,
                      fix_data=None):
         """Call the HandleError function for the checker we are associated with."""
-        if self.should_report_error(code):
+        if self._report_filter(code):
             self.error_handler.HandleError(
                 error.Error(code, message, token, position, fix_data))
 
@@ -92,23 +123,18 @@ class LintRulesBase(object):
           jsdoc flag.
         """
 
-        disabled_error_nums = []
-        if self.disable:
-            for error_str in self.disable:
-                error_num = 0
-                try:
-                    error_num = int(error_str)
-                except ValueError:
-                    pass
-                disabled_error_nums.append(error_num)
-
-        return ((self.jsdoc or error not in (
-            errors.MISSING_PARAMETER_DOCUMENTATION,
-            errors.MISSING_RETURN_DOCUMENTATION,
-            errors.MISSING_MEMBER_DOCUMENTATION,
-            errors.MISSING_PRIVATE,
-            errors.MISSING_JSDOC_TAG_THIS)) and
-                (not self.disable or error not in disabled_error_nums))
+        return ((self.jsdoc or error not in _MISSING_DOC_ERRORS) and
+                error not in self._disabled_error_nums)
+
+    @staticmethod
+    def _should_report_any_error(unused_error):
+        """Used by _HandleError when every error is reported."""
+        return True
+
+    @staticmethod
+    def _should_report_documented_error(error):
+        """Used by _HandleError when only missing JsDoc is ignored."""
+        return error not in _MISSING_DOC_ERRORS
 
 
 class CheckerBase(object):
@@ -168,20 +194,10 @@ class CheckerBase(object):
           stop_token: If given, check should stop at this token.
         """
 
-        self._ExecutePass(start_token, self._LintPass, stop_token=stop_token)
+        self._ExecutePass(start_token, self._lint_rules.CheckToken,
+                          stop_token=stop_token)
         self._lint_rules.Finalize(self._state_tracker)
 
-    def _LintPass(self, token):
-        """Checks an individual token for lint warnings/errors.
-
-        Used to encapsulate the logic needed to check an individual token so that it
-        can be passed to _ExecutePass.
-
-        Args:
-          token: The token to check.
-        """
-        self._lint_rules.CheckToken(token, self._state_tracker)
-
     def _ExecutePass(self, token, pass_function, stop_token=None):
         """Calls the given function for every token in the given token stream.
 
@@ -194,28 +210,81 @@ class CheckerBase(object):
         Args:
           token: The first token in the token stream.
           pass_function: The function to call for each token in the token stream.
+              It is called with the token and the state tracker, so methods
+              such as LintRulesBase.CheckToken can be passed directly.
           stop_token: The last token to check (if given).
 
         Raises:
           Exception: If any error occurred while calling the given function.
         """
 
-        self._state_tracker.Reset()
-        while token:
-            # When we are looking at a token and decided to delete the whole line, we
-            # will delete all of them in the "HandleToken()" below.  So the current
-            # token and subsequent ones may already be deleted here.  The way we
-            # delete a token does not wipe out the previous and next pointers of the
-            # deleted token.  So we need to check the token itself to make sure it is
-            # not deleted.
-            if not token.is_deleted:
-                # End the pass at the stop token
-                if stop_token and token is stop_token:
-                    return
-
-                self._state_tracker.HandleToken(
-                    token, self._state_tracker.GetLastNonSpaceToken())
-                pass_function(token)
-                self._state_tracker.HandleAfterToken(token)
-
-            token = token.next
+        state_tracker = self._state_tracker
+        state_tracker.Reset()
+
+        # Bind the per-token methods once; this loop runs for every token of
+        # every pass.
+        handle_token = state_tracker.HandleToken
+        get_last_non_space_token = state_tracker.GetLastNonSpaceToken
+        handle_after_token = state_tracker.HandleAfterToken
+
+        # When we are looking at a token and decided to delete the whole line, we
+        # will delete all of them in the "HandleToken()" below.  So the current
+        # token and subsequent ones may already be deleted here.  The way we
+        # delete a token does not wipe out the previous and next pointers of the
+        # deleted token.  So we need to check the token itself to make sure it is
+        # not deleted.
+        #
+        # Most passes have no stop token, so that case gets its own loop without
+        # the per-token stop check.
+        if not stop_token:
+            while token:
+                if not token.is_deleted:
+                    handle_token(token, get_last_non_space_token())
+                    pass_function(token, state_tracker)
+                    handle_after_token(token)
+
+                token = token.next
+        else:
+            while token:
+                if not token.is_deleted:
+                    # End the pass at the stop token
+                    if token is stop_token:
+                        return
+
+                    handle_token(token, get_last_non_space_token())
+                    pass_function(token, state_tracker)
+                    handle_after_token(token)
+
+                token = token.next
+
+    def _ExecutePassOverTokens(self, tokens, pass_function, stop_token=None):
+        """Calls the given function for every token in the given token list.
+
+        Works like _ExecutePass, but iterates a list of the tokens built ahead of
+        time rather than following the next pointers of each token.  Only use it
+        for passes that neither add nor delete tokens, since the list will not
+        reflect such changes.
+
+        Args:
+          tokens: A list of the tokens in the token stream, in order.
+          pass_function: The function to call for each token in the token stream,
+              with the token and the state tracker.
+          stop_token: The last token to check (if given).
+        """
+        if stop_token:
+            try:
+                tokens = tokens[:tokens.index(stop_token)]
+            except ValueError:
+                pass
+
+        state_tracker = self._state_tracker
+        state_tracker.Reset()
+
+        handle_token = state_tracker.HandleToken
+        get_last_non_space_token = state_tracker.GetLastNonSpaceToken
+        handle_after_token = state_tracker.HandleAfterToken
+
+        for token in tokens:
+            handle_token(token, get_last_non_space_token())
+            pass_function(token, state_tracker)
+            handle_after_token(token)
@@ -145,7 +145,7 @@ def StripTags(str):
             str = strip.get_output()
             final_text += str
             finished = True
-        except HTMLParser.HTMLParseError, e:
+        except HTMLParser.HTMLParseError as e:
             final_text += str[:e.offset]
             str = str[e.offset + 1:]
 
@@ -46,6 +46,41 @@ Modes = javascripttokenizer.JavaScriptModes
 Position = position.Position
 Type = javascripttokens.JavaScriptTokenType
 
+# Characters matched by \s in a non-unicode regex.
+_WHITESPACE_CHARS = ' \t\n\r\f\v'
+
+# Contexts in which a ':' is part of a label rather than a ternary.
+_LABEL_CONTEXTS = frozenset([
+    Context.LITERAL_ELEMENT, Context.CASE_BLOCK, Context.STATEMENT])
+
+_EXPRESSION_ENDER_TYPES = frozenset(Type.EXPRESSION_ENDER_TYPES)
+
+# Token types that may directly precede a '[' without a space.
+_NO_SPACE_BEFORE_BRACKET_TYPES = _EXPRESSION_ENDER_TYPES | frozenset([
+    Type.WHITESPACE, Type.START_PAREN, Type.START_BRACKET])
+
+# Doc flags that are only legal on localizable message definitions, in the
+# order they are reported.
+_MSG_ONLY_FLAGS = ('desc', 'hidden', 'meaning')
+
+
+def _HasMissingParameterSpace(string):
+    """Returns whether a comma in the string is followed by a non-space.
+
+    Args:
+      string: The string of a PARAMETERS token.
+
+    Returns:
+      True if some comma is directly followed by a non-whitespace character.
+    """
+    index = string.find(',')
+    while index != -1:
+        index += 1
+        if index < len(string) and string[index] not in _WHITESPACE_CHARS:
+            return True
+        index = string.find(',', index)
+    return False
+
 
 class EcmaScriptLintRules(checkerbase.LintRulesBase):
     """EmcaScript lint style checking rules.
@@ -59,23 +94,20 @@ class EcmaScriptLintRules(checkerbase.LintRulesBase):
     language.
     """
 
+    __slots__ = ('custom_jsdoc_tags', 'dot_on_next_line', 'check_trailing_comma',
+                 'debug_indentation', '_indentation', 'jslint_error', 'strict',
+                 '_check_indentation', '_long_line_exceptions',
+                 '_long_line_ignore', '_token_handlers')
+
     # It will be initialized in constructor so the flags are initialized.
     max_line_length = -1
 
     # Static constants.
-    MISSING_PARAMETER_SPACE = re.compile(r',\S')
-
-    EXTRA_SPACE = re.compile(r'(\(\s|\s\))')
-
-    ENDS_WITH_SPACE = re.compile(r'\s$')
-
-    ILLEGAL_TAB = re.compile(r'\t')
-
     # Regex used to split up complex types to check for invalid use of ? and |.
     TYPE_SPLIT = re.compile(r'[,<>()]')
 
     # Regex for form of author lines after the @author tag.
-    AUTHOR_SPEC = re.compile(r'(\s*)[^\s]+@[^(\s]+(\s*)\(.+\)')
+    AUTHOR_SPEC = re.compile(r'(\s*)\S+@[^\s(]+(\s*)\(.+\)')
 
     # Acceptable tokens to remove for line too long testing.
     LONG_LINE_IGNORE = frozenset(
@@ -116,6 +148,38 @@ class EcmaScriptLintRules(checkerbase.LintRulesBase):
             self.debug_indentation)
         self.jslint_error = jslint_error or []
         self.strict = strict
+        # TODO(robbyw): Support checking indentation in HTML files.
+        self._check_indentation = (
+            not self._is_html and self.should_check(Rule.INDENTATION))
+
+        # Both only depend on configuration, so build them once instead of for
+        # every over-long line.
+        self._long_line_exceptions = tuple(self.GetLongLineExceptions())
+        # Custom tags like @requires may have url like descriptions, so ignore
+        # the tag, similar to how we handle @see.
+        self._long_line_ignore = self.LONG_LINE_IGNORE | frozenset(
+            '@%s' % f for f in self.custom_jsdoc_tags)
+
+        # Per token type checks, called from CheckToken with the token, the
+        # state and the first_in_line, last_in_line and last_non_space_token
+        # values CheckToken computes.
+        self._token_handlers = {
+            Type.PARAMETERS: self._CheckParameters,
+            Type.START_BLOCK: self._CheckStartBlock,
+            Type.END_BLOCK: self._CheckEndBlock,
+            Type.SEMICOLON: self._CheckSemicolon,
+            Type.START_PAREN: self._CheckStartParen,
+            Type.START_BRACKET: self._HandleStartBracket,
+            Type.END_PAREN: self._CheckEndParenOrBracket,
+            Type.END_BRACKET: self._CheckEndParenOrBracket,
+            Type.WHITESPACE: self._CheckWhitespace,
+            Type.OPERATOR: self._CheckOperator,
+            Type.DOC_FLAG: self._CheckDocFlag,
+            Type.DOC_INLINE_FLAG: self._CheckDocFlagName,
+            Type.SIMPLE_LVALUE: self._CheckSimpleLvalue,
+            Type.END_PARAMETERS: self._CheckEndParameters,
+            Type.STRING_TEXT: self._CheckStringText,
+        }
 
     def HandleMissingParameterDoc(self, token, param_name):
         """Handle errors associated with a parameter missing a @param tag."""
@@ -128,28 +192,40 @@ class EcmaScriptLintRules(checkerbase.LintRulesBase):
           last_token: The last token in the line.
           state: parser_state object that indicates the current state in the page
         """
+        # The rebuilt line below is never longer than the source line, so most
+        # lines can be accepted without walking their tokens.
+        if (len(last_token.line.rstrip('\n\r\f')) <=
+                EcmaScriptLintRules.max_line_length):
+            return
+
         # Start from the last token so that we have the flag object attached to
         # and DOC_FLAG tokens.
         line_number = last_token.line_number
         token = last_token
 
         # Build a representation of the string where spaces indicate potential
-        # line-break locations.
+        # line-break locations. The parts are collected back to front.
         line = []
         while token and token.line_number == line_number:
             if state.IsTypeToken(token):
-                line.insert(0, 'x' * len(token.string))
+                line.append('x' * len(token.string))
             elif token.type in (Type.IDENTIFIER, Type.OPERATOR):
                 # Dots are acceptable places to wrap (may be tokenized as identifiers).
-                line.insert(0, token.string.replace('.', ' '))
+                line.append(token.string.replace('.', ' '))
             else:
-                line.insert(0, token.string)
+                line.append(token.string)
             token = token.previous
 
+        line.reverse()
         line = ''.join(line)
         line = line.rstrip('\n\r\f')
+
+        # The byte length is an upper bound on the utf-8 character count, so
+        # only lines over the limit need to be decoded.
+        if len(line) <= EcmaScriptLintRules.max_line_length:
+            return
         try:
-            length = len(unicode(line, 'utf-8'))
+            length = len(line.decode('utf-8'))
         except (LookupError, UnicodeDecodeError):
             # Unknown encoding. The line length may be wrong, as was originally the
             # case for utf-8 (see bug 1735846). For now just accept the default
@@ -161,24 +237,35 @@ class EcmaScriptLintRules(checkerbase.LintRulesBase):
         if length > EcmaScriptLintRules.max_line_length:
 
             # If the line matches one of the exceptions, then it's ok.
-            for long_line_regexp in self.GetLongLineExceptions():
+            for long_line_regexp in self._long_line_exceptions:
                 if long_line_regexp.match(last_token.line):
                     return
 
             # If the line consists of only one "word", or multiple words but all
             # except one are ignoreable, then it's ok.
-            parts = set(line.split())
-
-            # We allow two "words" (type and name) when the line contains @param
-            max_parts = 1
-            if '@param' in parts:
-                max_parts = 2
-
-            # Custom tags like @requires may have url like descriptions, so ignore
-            # the tag, similar to how we handle @see.
-            custom_tags = set(['@%s' % f for f in self.custom_jsdoc_tags])
-            if (len(parts.difference(self.LONG_LINE_IGNORE | custom_tags))
-                > max_parts):
+            if '@' not in line and '*' not in line and '//' not in line:
+                # Every ignorable word contains one of these, so only a line
+                # repeating a single word is ok.
+                words = line.split()
+                too_long = any(word != words[0] for word in words)
+            else:
+                # We allow two "words" (type and name) when the line contains
+                # @param. Only distinct words count, and no line may have more
+                # than two, so stop collecting once there is a third.
+                max_parts = 1
+                parts = []
+                for word in line.split():
+                    if word in self._long_line_ignore:
+                        if word == '@param':
+                            max_parts = 2
+                    elif word not in parts:
+                        parts.append(word)
+                        if len(parts) > 2:
+                            break
+
+                too_long = len(parts) > max_parts
+
+            if too_long:
                 self._HandleError(
                     errors.LINE_TOO_LONG,
                     'Line too long (%d characters).' % len(line), last_token)
@@ -227,16 +314,22 @@ class EcmaScriptLintRules(checkerbase.LintRulesBase):
                 token,
                 position=Position.AtBeginning())
 
-    def _CheckOperator(self, token):
+    def _CheckOperator(self, token, state, first_in_line, last_in_line,
+                       last_non_space_token):
         """Checks an operator for spacing and line style.
 
         Args:
           token: The operator token.
+          state: parser_state object that indicates the current state in the page
+          first_in_line: Whether the token is the first in its line.
+          last_in_line: Whether the token is the last in its line.
+          last_non_space_token: The last token that was not a space.
         """
         last_code = token.metadata.last_code
+        is_dot = tokenutil.IsDot(token)
 
         if not self._ExpectSpaceBeforeOperator(token):
-            if (token.previous and token.previous.type == Type.WHITESPACE and
+            if (token.previous and token.previous.type is Type.WHITESPACE and
                 last_code and last_code.type in (Type.NORMAL, Type.IDENTIFIER) and
                 last_code.line_number == token.line_number):
                 self._HandleError(
@@ -245,8 +338,8 @@ class EcmaScriptLintRules(checkerbase.LintRulesBase):
 
         elif (token.previous and
               not token.previous.IsComment() and
-              not tokenutil.IsDot(token) and
-              token.previous.type in Type.EXPRESSION_ENDER_TYPES):
+              not is_dot and
+              token.previous.type in _EXPRESSION_ENDER_TYPES):
             self._HandleError(errors.MISSING_SPACE,
                               'Missing space before "%s"' % token.string, token,
                               position=Position.AtBeginning())
@@ -254,7 +347,6 @@ class EcmaScriptLintRules(checkerbase.LintRulesBase):
         # Check wrapping of operators.
         next_code = tokenutil.GetNextCodeToken(token)
 
-        is_dot = tokenutil.IsDot(token)
         wrapped_before = last_code and last_code.line_number != token.line_number
         wrapped_after = next_code and next_code.line_number != token.line_number
 
@@ -276,9 +368,7 @@ class EcmaScriptLintRules(checkerbase.LintRulesBase):
         # ternary.
 
         return (token.string == ':' and
-                token.metadata.context.type in (Context.LITERAL_ELEMENT,
-                                                Context.CASE_BLOCK,
-                                                Context.STATEMENT))
+                token.metadata.context.type in _LABEL_CONTEXTS)
 
     def _ExpectSpaceBeforeOperator(self, token):
         """Returns whether a space should appear before the given operator token.
@@ -317,12 +407,11 @@ class EcmaScriptLintRules(checkerbase.LintRulesBase):
         first_in_line = token.IsFirstInLine()
         last_in_line = token.IsLastInLine()
         last_non_space_token = state.GetLastNonSpaceToken()
-
+        # Error fixes may change a token's string but never its type.
         token_type = token.type
 
         # Process the line change.
-        if not self._is_html and self.should_check(Rule.INDENTATION):
-            # TODO(robbyw): Support checking indentation in HTML files.
+        if self._check_indentation:
             indentation_errors = self._indentation.CheckToken(token, state)
             for indentation_error in indentation_errors:
                 self._HandleError(*indentation_error)
@@ -330,481 +419,554 @@ class EcmaScriptLintRules(checkerbase.LintRulesBase):
         if last_in_line:
             self._CheckLineLength(token, state)
 
-        if token_type == Type.PARAMETERS:
-            # Find missing spaces in parameter lists.
-            if self.MISSING_PARAMETER_SPACE.search(token.string):
-                fix_data = ', '.join([s.strip() for s in token.string.split(',')])
-                self._HandleError(errors.MISSING_SPACE, 'Missing space after ","',
-                                  token, position=None, fix_data=fix_data.strip())
-
-            # Find extra spaces at the beginning of parameter lists.  Make sure
-            # we aren't at the beginning of a continuing multi-line list.
-            if not first_in_line:
-                space_count = len(token.string) - len(token.string.lstrip())
-                if space_count:
-                    self._HandleError(errors.EXTRA_SPACE, 'Extra space after "("',
-                                      token, position=Position(0, space_count))
-
-        elif (token_type == Type.START_BLOCK and
-              token.metadata.context.type == Context.BLOCK):
+        handler = self._token_handlers.get(token_type)
+        if handler:
+            handler(token, state, first_in_line, last_in_line,
+                    last_non_space_token)
+
+        # This check is orthogonal to the per type ones above, and repeats some
+        # types, so it is not part of the handler table.
+        if token_type in Type.COMMENT_TYPES:
+            if '\t' in token.string:
+                self._HandleError(errors.ILLEGAL_TAB,
+                                  'Illegal tab in comment "%s"' % token.string, token)
+
+            # Check for extra whitespace at the end of a line.
+            if last_in_line and token.string[-1:].isspace():
+                trimmed = token.string.rstrip()
+                self._HandleError(
+                    errors.EXTRA_SPACE, 'Extra space at end of line', token,
+                    position=Position(len(trimmed), len(token.string) - len(trimmed)))
+
+        # This check is also orthogonal since it is based on metadata.
+        if token.metadata.is_implied_semicolon:
+            self._HandleError(errors.MISSING_SEMICOLON,
+                              'Missing semicolon at end of line', token)
+
+    def _CheckParameters(self, token, state, first_in_line, last_in_line,
+                         last_non_space_token):
+        """Checks spacing in a parameter list."""
+        # Find missing spaces in parameter lists.
+        if _HasMissingParameterSpace(token.string):
+            fix_data = ', '.join([s.strip() for s in token.string.split(',')])
+            self._HandleError(errors.MISSING_SPACE, 'Missing space after ","',
+                              token, position=None, fix_data=fix_data.strip())
+
+        # Find extra spaces at the beginning of parameter lists.  Make sure
+        # we aren't at the beginning of a continuing multi-line list. The
+        # string is read again as fixing the error above may replace it.
+        if not first_in_line and token.string[:1].isspace():
+            space_count = len(token.string) - len(token.string.lstrip())
+            self._HandleError(errors.EXTRA_SPACE, 'Extra space after "("',
+                              token, position=Position(0, space_count))
+
+    def _CheckStartBlock(self, token, state, first_in_line, last_in_line,
+                         last_non_space_token):
+        """Checks spacing before the opening brace of a block."""
+        if token.metadata.context.type is Context.BLOCK:
             self._CheckForMissingSpaceBeforeToken(token)
 
-        elif token_type == Type.END_BLOCK:
-            last_code = token.metadata.last_code
+    def _CheckEndBlock(self, token, state, first_in_line, last_in_line,
+                       last_non_space_token):
+        """Checks a closing brace."""
+        last_code = token.metadata.last_code
+        next_token = token.next
 
-            if self.check_trailing_comma:
-                if last_code.IsOperator(','):
-                    self._HandleError(
-                        errors.COMMA_AT_END_OF_LITERAL,
-                        'Illegal comma at end of object literal', last_code,
-                        position=Position.All(last_code.string))
-
-            if state.InFunction() and state.IsFunctionClose():
-                if state.InTopLevelFunction():
-                    # A semicolons should not be included at the end of a function
-                    # declaration.
-                    if not state.InAssignedFunction():
-                        if not last_in_line and token.next.type == Type.SEMICOLON:
-                            self._HandleError(
-                                errors.ILLEGAL_SEMICOLON_AFTER_FUNCTION,
-                                'Illegal semicolon after function declaration',
-                                token.next, position=Position.All(token.next.string))
-
-                # A semicolon should be included at the end of a function expression
-                # that is not immediately called or used by a dot operator.
-                if (state.InAssignedFunction() and token.next
-                    and token.next.type != Type.SEMICOLON):
-                    next_token = tokenutil.GetNextCodeToken(token)
-                    is_immediately_used = next_token and (
-                        next_token.type == Type.START_PAREN or
-                        tokenutil.IsDot(next_token))
-                    if not is_immediately_used:
+        if self.check_trailing_comma:
+            if last_code.IsOperator(','):
+                self._HandleError(
+                    errors.COMMA_AT_END_OF_LITERAL,
+                    'Illegal comma at end of object literal', last_code,
+                    position=Position.All(last_code.string))
+
+        if state.InFunction() and state.IsFunctionClose():
+            in_assigned_function = state.InAssignedFunction()
+            if state.InTopLevelFunction():
+                # A semicolons should not be included at the end of a function
+                # declaration.
+                if not in_assigned_function:
+                    if not last_in_line and next_token.type is Type.SEMICOLON:
                         self._HandleError(
-                            errors.MISSING_SEMICOLON_AFTER_FUNCTION,
-                            'Missing semicolon after function assigned to a variable',
-                            token, position=Position.AtEnd(token.string))
-
-                if state.InInterfaceMethod() and last_code.type != Type.START_BLOCK:
-                    self._HandleError(errors.INTERFACE_METHOD_CANNOT_HAVE_CODE,
-                                      'Interface methods cannot contain code', last_code)
-
-            elif (state.IsBlockClose() and
-                  token.next and token.next.type == Type.SEMICOLON):
-                if (last_code.metadata.context.parent.type != Context.OBJECT_LITERAL
-                    and last_code.metadata.context.type != Context.OBJECT_LITERAL):
+                            errors.ILLEGAL_SEMICOLON_AFTER_FUNCTION,
+                            'Illegal semicolon after function declaration',
+                            next_token, position=Position.All(next_token.string))
+
+            # A semicolon should be included at the end of a function expression
+            # that is not immediately called or used by a dot operator.
+            if (in_assigned_function and next_token
+                and next_token.type is not Type.SEMICOLON):
+                next_code = tokenutil.GetNextCodeToken(token)
+                is_immediately_used = next_code and (
+                    next_code.type is Type.START_PAREN or
+                    tokenutil.IsDot(next_code))
+                if not is_immediately_used:
                     self._HandleError(
-                        errors.REDUNDANT_SEMICOLON,
-                        'No semicolon is required to end a code block',
-                        token.next, position=Position.All(token.next.string))
-
-        elif token_type == Type.SEMICOLON:
-            if token.previous and token.previous.type == Type.WHITESPACE:
+                        errors.MISSING_SEMICOLON_AFTER_FUNCTION,
+                        'Missing semicolon after function assigned to a variable',
+                        token, position=Position.AtEnd(token.string))
+
+            if (state.InInterfaceMethod() and
+                    last_code.type is not Type.START_BLOCK):
+                self._HandleError(errors.INTERFACE_METHOD_CANNOT_HAVE_CODE,
+                                  'Interface methods cannot contain code', last_code)
+
+        elif (state.IsBlockClose() and
+              next_token and next_token.type is Type.SEMICOLON):
+            last_code_context = last_code.metadata.context
+            if (last_code_context.parent.type is not Context.OBJECT_LITERAL
+                and last_code_context.type is not Context.OBJECT_LITERAL):
                 self._HandleError(
-                    errors.EXTRA_SPACE, 'Extra space before ";"',
-                    token.previous, position=Position.All(token.previous.string))
+                    errors.REDUNDANT_SEMICOLON,
+                    'No semicolon is required to end a code block',
+                    next_token, position=Position.All(next_token.string))
+
+    def _CheckSemicolon(self, token, state, first_in_line, last_in_line,
+                        last_non_space_token):
+        """Checks spacing and redundancy of a semicolon."""
+        metadata = token.metadata
+        previous = token.previous
+        if previous and previous.type is Type.WHITESPACE:
+            self._HandleError(
+                errors.EXTRA_SPACE, 'Extra space before ";"',
+                previous, position=Position.All(previous.string))
 
-            if token.next and token.next.line_number == token.line_number:
-                if token.metadata.context.type != Context.FOR_GROUP_BLOCK:
-                    # TODO(robbyw): Error about no multi-statement lines.
-                    pass
+        next_token = token.next
+        if next_token and next_token.line_number == token.line_number:
+            if metadata.context.type is not Context.FOR_GROUP_BLOCK:
+                # TODO(robbyw): Error about no multi-statement lines.
+                pass
 
-                elif token.next.type not in (
-                    Type.WHITESPACE, Type.SEMICOLON, Type.END_PAREN):
-                    self._HandleError(
-                        errors.MISSING_SPACE,
-                        'Missing space after ";" in for statement',
-                        token.next,
-                        position=Position.AtBeginning())
-
-            last_code = token.metadata.last_code
-            if last_code and last_code.type == Type.SEMICOLON:
-                # Allow a single double semi colon in for loops for cases like:
-                # for (;;) { }.
-                # NOTE(user): This is not a perfect check, and will not throw an error
-                # for cases like: for (var i = 0;; i < n; i++) {}, but then your code
-                # probably won't work either.
-                for_token = tokenutil.CustomSearch(
-                    last_code,
-                    lambda token: token.type == Type.KEYWORD and token.string == 'for',
-                    end_func=lambda token: token.type == Type.SEMICOLON,
-                    distance=None,
-                    reverse=True)
-
-                if not for_token:
-                    self._HandleError(errors.REDUNDANT_SEMICOLON, 'Redundant semicolon',
-                                      token, position=Position.All(token.string))
-
-        elif token_type == Type.START_PAREN:
-            # Ensure that opening parentheses have a space before any keyword
-            # that is not being invoked like a member function.
-            if (token.previous and token.previous.type == Type.KEYWORD and
-                (not token.previous.metadata or
-                 not token.previous.metadata.last_code or
-                 not token.previous.metadata.last_code.string or
-                 token.previous.metadata.last_code.string[-1:] != '.')):
+            elif next_token.type not in (
+                Type.WHITESPACE, Type.SEMICOLON, Type.END_PAREN):
+                self._HandleError(
+                    errors.MISSING_SPACE,
+                    'Missing space after ";" in for statement',
+                    next_token,
+                    position=Position.AtBeginning())
+
+        last_code = metadata.last_code
+        if last_code and last_code.type is Type.SEMICOLON:
+            # Allow a single double semi colon in for loops for cases like:
+            # for (;;) { }.
+            # NOTE(user): This is not a perfect check, and will not throw an error
+            # for cases like: for (var i = 0;; i < n; i++) {}, but then your code
+            # probably won't work either.
+            for_token = last_code.previous
+            while for_token:
+                if for_token.type is Type.KEYWORD and for_token.string == 'for':
+                    break
+                if for_token.type is Type.SEMICOLON:
+                    for_token = None
+                    break
+                for_token = for_token.previous
+
+            if not for_token:
+                self._HandleError(errors.REDUNDANT_SEMICOLON, 'Redundant semicolon',
+                                  token, position=Position.All(token.string))
+
+    def _CheckStartParen(self, token, state, first_in_line, last_in_line,
+                         last_non_space_token):
+        """Checks spacing before an opening paren."""
+        previous = token.previous
+        if not previous:
+            return
+
+        # Ensure that opening parentheses have a space before any keyword
+        # that is not being invoked like a member function.
+        if previous.type is Type.KEYWORD:
+            last_code = previous.metadata and previous.metadata.last_code
+            if not last_code or not last_code.string.endswith('.'):
                 self._HandleError(errors.MISSING_SPACE, 'Missing space before "("',
                                   token, position=Position.AtBeginning())
-            elif token.previous and token.previous.type == Type.WHITESPACE:
-                before_space = token.previous.previous
-                # Ensure that there is no extra space before a function invocation,
-                # even if the function being invoked happens to be a keyword.
-                if (before_space and before_space.line_number == token.line_number and
-                    before_space.type == Type.IDENTIFIER or
-                    (before_space.type == Type.KEYWORD and before_space.metadata and
-                     before_space.metadata.last_code and
-                     before_space.metadata.last_code.string and
-                     before_space.metadata.last_code.string[-1:] == '.')):
-                    self._HandleError(
-                        errors.EXTRA_SPACE, 'Extra space before "("',
-                        token.previous, position=Position.All(token.previous.string))
-
-        elif token_type == Type.START_BRACKET:
-            self._HandleStartBracket(token, last_non_space_token)
-        elif token_type in (Type.END_PAREN, Type.END_BRACKET):
-            # Ensure there is no space before closing parentheses, except when
-            # it's in a for statement with an omitted section, or when it's at the
-            # beginning of a line.
-
-            last_code = token.metadata.last_code
-            if self.check_trailing_comma and token_type == Type.END_BRACKET:
-                if last_code.IsOperator(','):
-                    self._HandleError(
-                        errors.COMMA_AT_END_OF_LITERAL,
-                        'Illegal comma at end of array literal', last_code,
-                        position=Position.All(last_code.string))
-
-            if (token.previous and token.previous.type == Type.WHITESPACE and
-                not token.previous.IsFirstInLine() and
-                not (last_non_space_token and last_non_space_token.line_number ==
-                     token.line_number and
-                     last_non_space_token.type == Type.SEMICOLON)):
+        elif previous.type is Type.WHITESPACE:
+            before_space = previous.previous
+            # Ensure that there is no extra space before a function invocation,
+            # even if the function being invoked happens to be a keyword.
+            if before_space and before_space.line_number == token.line_number:
+                is_invocation = before_space.type is Type.IDENTIFIER
+            else:
+                is_invocation = False
+            if not is_invocation and before_space.type is Type.KEYWORD:
+                last_code = (before_space.metadata and
+                             before_space.metadata.last_code)
+                is_invocation = bool(last_code and
+                                     last_code.string.endswith('.'))
+            if is_invocation:
                 self._HandleError(
-                    errors.EXTRA_SPACE, 'Extra space before "%s"' %
-                    token.string, token.previous,
-                    position=Position.All(token.previous.string))
-
-        elif token_type == Type.WHITESPACE:
-            if self.ILLEGAL_TAB.search(token.string):
-                if token.IsFirstInLine():
-                    if token.next:
-                        self._HandleError(
-                            errors.ILLEGAL_TAB,
-                            'Illegal tab in whitespace before "%s"' % token.next.string,
-                            token, position=Position.All(token.string))
-                    else:
-                        self._HandleError(
-                            errors.ILLEGAL_TAB,
-                            'Illegal tab in whitespace',
-                            token, position=Position.All(token.string))
+                    errors.EXTRA_SPACE, 'Extra space before "("',
+                    previous, position=Position.All(previous.string))
+
+    def _CheckEndParenOrBracket(self, token, state, first_in_line, last_in_line,
+                                last_non_space_token):
+        """Checks a closing paren or bracket."""
+        # Ensure there is no space before closing parentheses, except when
+        # it's in a for statement with an omitted section, or when it's at the
+        # beginning of a line.
+
+        last_code = token.metadata.last_code
+        if self.check_trailing_comma and token.type is Type.END_BRACKET:
+            if last_code.IsOperator(','):
+                self._HandleError(
+                    errors.COMMA_AT_END_OF_LITERAL,
+                    'Illegal comma at end of array literal', last_code,
+                    position=Position.All(last_code.string))
+
+        previous = token.previous
+        if (previous and previous.type is Type.WHITESPACE and
+            not previous.IsFirstInLine() and
+            not (last_non_space_token and last_non_space_token.line_number ==
+                 token.line_number and
+                 last_non_space_token.type is Type.SEMICOLON)):
+            self._HandleError(
+                errors.EXTRA_SPACE, 'Extra space before "%s"' %
+                token.string, previous,
+                position=Position.All(previous.string))
+
+    def _CheckWhitespace(self, token, state, first_in_line, last_in_line,
+                         last_non_space_token):
+        """Checks a whitespace token for tabs and extra space."""
+        if '\t' in token.string:
+            if token.IsFirstInLine():
+                if token.next:
+                    self._HandleError(
+                        errors.ILLEGAL_TAB,
+                        'Illegal tab in whitespace before "%s"' % token.next.string,
+                        token, position=Position.All(token.string))
                 else:
                     self._HandleError(
                         errors.ILLEGAL_TAB,
-                        'Illegal tab in whitespace after "%s"' % token.previous.string,
+                        'Illegal tab in whitespace',
                         token, position=Position.All(token.string))
+            else:
+                self._HandleError(
+                    errors.ILLEGAL_TAB,
+                    'Illegal tab in whitespace after "%s"' % token.previous.string,
+                    token, position=Position.All(token.string))
 
-            # Check whitespace length if it's not the first token of the line and
-            # if it's not immediately before a comment.
-            if last_in_line:
-                # Check for extra whitespace at the end of a line.
-                self._HandleError(errors.EXTRA_SPACE, 'Extra space at end of line',
-                                  token, position=Position.All(token.string))
-            elif not first_in_line and not token.next.IsComment():
-                if token.length > 1:
+        # Check whitespace length if it's not the first token of the line and
+        # if it's not immediately before a comment.
+        if last_in_line:
+            # Check for extra whitespace at the end of a line.
+            self._HandleError(errors.EXTRA_SPACE, 'Extra space at end of line',
+                              token, position=Position.All(token.string))
+        elif not first_in_line and not token.next.IsComment():
+            if token.length > 1:
+                self._HandleError(
+                    errors.EXTRA_SPACE, 'Extra space after "%s"' %
+                    token.previous.string, token,
+                    position=Position(1, len(token.string) - 1))
+
+    def _CheckDocFlag(self, token, state, first_in_line, last_in_line,
+                      last_non_space_token):
+        """Checks a block jsdoc flag."""
+        self._CheckDocFlagValue(token, state, first_in_line, last_in_line,
+                                last_non_space_token)
+        self._CheckDocFlagName(token, state, first_in_line, last_in_line,
+                               last_non_space_token)
+
+    def _CheckDocFlagValue(self, token, state, first_in_line, last_in_line,
+                           last_non_space_token):
+        """Checks the value and type of a jsdoc flag."""
+        flag = token.attached_object
+        doc_flag = state.GetDocFlag()
+
+        if flag.flag_type == 'bug':
+            # TODO(robbyw): Check for exactly 1 space on the left.
+            string = token.next.string.lstrip()
+            string = string.split(' ', 1)[0]
+
+            if not string.isdigit():
+                self._HandleError(errors.NO_BUG_NUMBER_AFTER_BUG_TAG,
+                                  '@bug should be followed by a bug number', token)
+
+        elif flag.flag_type == 'suppress':
+            if flag.type is None:
+                # A syntactically invalid suppress tag will get tokenized as a normal
+                # flag, indicating an error.
+                self._HandleError(
+                    errors.INCORRECT_SUPPRESS_SYNTAX,
+                    'Invalid suppress syntax: should be @suppress {errortype}. '
+                    'Spaces matter.', token)
+            else:
+                suppress_types = doc_flag.SUPPRESS_TYPES
+                for suppress_type in flag.jstype.IterIdentifiers():
+                    if suppress_type not in suppress_types:
+                        self._HandleError(
+                            errors.INVALID_SUPPRESS_TYPE,
+                            'Invalid suppression type: %s' % suppress_type, token)
+
+        elif (self.should_check(Rule.WELL_FORMED_AUTHOR) and
+              flag.flag_type == 'author'):
+            # TODO(user): In non strict mode check the author tag for as much as
+            # it exists, though the full form checked below isn't required.
+            string = token.next.string
+            result = self.AUTHOR_SPEC.match(string)
+            if not result:
+                self._HandleError(errors.INVALID_AUTHOR_TAG_DESCRIPTION,
+                                  'Author tag line should be of the form: '
+                                  '@author foo@somewhere.com (Your Name)',
+                                  token.next)
+            else:
+                # Check spacing between email address and name. Do this before
+                # checking earlier spacing so positions are easier to calculate for
+                # autofixing.
+                num_spaces = len(result.group(2))
+                if num_spaces < 1:
+                    self._HandleError(errors.MISSING_SPACE,
+                                      'Missing space after email address',
+                                      token.next, position=Position(result.start(2), 0))
+                elif num_spaces > 1:
                     self._HandleError(
-                        errors.EXTRA_SPACE, 'Extra space after "%s"' %
-                        token.previous.string, token,
-                        position=Position(1, len(token.string) - 1))
-
-        elif token_type == Type.OPERATOR:
-            self._CheckOperator(token)
-        elif token_type == Type.DOC_FLAG:
-            flag = token.attached_object
-
-            if flag.flag_type == 'bug':
-                # TODO(robbyw): Check for exactly 1 space on the left.
-                string = token.next.string.lstrip()
-                string = string.split(' ', 1)[0]
-
-                if not string.isdigit():
-                    self._HandleError(errors.NO_BUG_NUMBER_AFTER_BUG_TAG,
-                                      '@bug should be followed by a bug number', token)
-
-            elif flag.flag_type == 'suppress':
-                if flag.type is None:
-                    # A syntactically invalid suppress tag will get tokenized as a normal
-                    # flag, indicating an error.
+                        errors.EXTRA_SPACE, 'Extra space after email address',
+                        token.next,
+                        position=Position(result.start(2) + 1, num_spaces - 1))
+
+                # Check for extra spaces before email address. Can't be too few, if
+                # not at least one we wouldn't match @author tag.
+                num_spaces = len(result.group(1))
+                if num_spaces > 1:
+                    self._HandleError(errors.EXTRA_SPACE,
+                                      'Extra space before email address',
+                                      token.next, position=Position(1, num_spaces - 1))
+
+        elif (not self._limited_doc_checks and
+              flag.flag_type in doc_flag.HAS_DESCRIPTION):
+            if flag.flag_type == 'param':
+                if flag.name is None:
+                    self._HandleError(errors.MISSING_JSDOC_PARAM_NAME,
+                                      'Missing name in @param tag', token)
+
+            if not flag.description or flag.description is None:
+                flag_name = token.type
+                if 'name' in token.values:
+                    flag_name = '@' + token.values['name']
+
+                if flag_name not in self.JSDOC_FLAGS_DESCRIPTION_NOT_REQUIRED:
                     self._HandleError(
-                        errors.INCORRECT_SUPPRESS_SYNTAX,
-                        'Invalid suppress syntax: should be @suppress {errortype}. '
-                        'Spaces matter.', token)
-                else:
-                    for suppress_type in flag.jstype.IterIdentifiers():
-                        if suppress_type not in state.GetDocFlag().SUPPRESS_TYPES:
-                            self._HandleError(
-                                errors.INVALID_SUPPRESS_TYPE,
-                                'Invalid suppression type: %s' % suppress_type, token)
-
-            elif (self.should_check(Rule.WELL_FORMED_AUTHOR) and
-                  flag.flag_type == 'author'):
-                # TODO(user): In non strict mode check the author tag for as much as
-                # it exists, though the full form checked below isn't required.
-                string = token.next.string
-                result = self.AUTHOR_SPEC.match(string)
-                if not result:
-                    self._HandleError(errors.INVALID_AUTHOR_TAG_DESCRIPTION,
-                                      'Author tag line should be of the form: '
-                                      '@author foo@somewhere.com (Your Name)',
-                                      token.next)
-                else:
-                    # Check spacing between email address and name. Do this before
-                    # checking earlier spacing so positions are easier to calculate for
-                    # autofixing.
-                    num_spaces = len(result.group(2))
-                    if num_spaces < 1:
-                        self._HandleError(errors.MISSING_SPACE,
-                                          'Missing space after email address',
-                                          token.next, position=Position(result.start(2), 0))
-                    elif num_spaces > 1:
-                        self._HandleError(
-                            errors.EXTRA_SPACE, 'Extra space after email address',
-                            token.next,
-                            position=Position(result.start(2) + 1, num_spaces - 1))
-
-                    # Check for extra spaces before email address. Can't be too few, if
-                    # not at least one we wouldn't match @author tag.
-                    num_spaces = len(result.group(1))
-                    if num_spaces > 1:
-                        self._HandleError(errors.EXTRA_SPACE,
-                                          'Extra space before email address',
-                                          token.next, position=Position(1, num_spaces - 1))
-
-            elif (flag.flag_type in state.GetDocFlag().HAS_DESCRIPTION and
-                  not self._limited_doc_checks):
-                if flag.flag_type == 'param':
-                    if flag.name is None:
-                        self._HandleError(errors.MISSING_JSDOC_PARAM_NAME,
-                                          'Missing name in @param tag', token)
-
-                if not flag.description or flag.description is None:
-                    flag_name = token.type
-                    if 'name' in token.values:
-                        flag_name = '@' + token.values['name']
-
-                    if flag_name not in self.JSDOC_FLAGS_DESCRIPTION_NOT_REQUIRED:
-                        self._HandleError(
-                            errors.MISSING_JSDOC_TAG_DESCRIPTION,
-                            'Missing description in %s tag' % flag_name, token)
-                else:
-                    self._CheckForMissingSpaceBeforeToken(flag.description_start_token)
+                        errors.MISSING_JSDOC_TAG_DESCRIPTION,
+                        'Missing description in %s tag' % flag_name, token)
+            else:
+                self._CheckForMissingSpaceBeforeToken(flag.description_start_token)
 
-            if flag.HasType():
-                if flag.type_start_token is not None:
-                    self._CheckForMissingSpaceBeforeToken(
-                        token.attached_object.type_start_token)
+        if flag.HasType():
+            if flag.type_start_token is not None:
+                self._CheckForMissingSpaceBeforeToken(
+                    token.attached_object.type_start_token)
 
-                if flag.jstype and not flag.jstype.IsEmpty():
-                    self._CheckJsDocType(token, flag.jstype)
+            if flag.jstype and not flag.jstype.IsEmpty():
+                self._CheckJsDocType(token, flag.jstype)
 
-                    if self.should_check(Rule.BRACES_AROUND_TYPE) and (
-                        flag.type_start_token.type != Type.DOC_START_BRACE or
-                        flag.type_end_token.type != Type.DOC_END_BRACE):
+                if self.should_check(Rule.BRACES_AROUND_TYPE) and (
+                    flag.type_start_token.type is not Type.DOC_START_BRACE or
+                    flag.type_end_token.type is not Type.DOC_END_BRACE):
+                    self._HandleError(
+                        errors.MISSING_BRACES_AROUND_TYPE,
+                        'Type must always be surrounded by curly braces.', token)
+
+    def _CheckDocFlagName(self, token, state, first_in_line, last_in_line,
+                          last_non_space_token):
+        """Checks the name of a block or inline jsdoc flag."""
+        if (token.values['name'] not in state.GetDocFlag().LEGAL_DOC and
+            token.values['name'] not in self.custom_jsdoc_tags):
+            self._HandleError(
+                errors.INVALID_JSDOC_TAG,
+                'Invalid JsDoc tag: %s' % token.values['name'], token)
+
+        if (self.should_check(Rule.NO_BRACES_AROUND_INHERIT_DOC) and
+            token.values['name'] == 'inheritDoc' and
+            token.type is Type.DOC_INLINE_FLAG):
+            self._HandleError(errors.UNNECESSARY_BRACES_AROUND_INHERIT_DOC,
+                              'Unnecessary braces around @inheritDoc',
+                              token)
+
+    def _CheckSimpleLvalue(self, token, state, first_in_line, last_in_line,
+                           last_non_space_token):
+        """Checks the documentation of an assigned identifier."""
+        identifier = token.values['identifier']
+        has_dot = '.' in identifier
+
+        if ((not state.InFunction() or state.InConstructor()) and
+            state.InTopLevel() and not state.InObjectLiteralDescendant()):
+            jsdoc = state.GetDocComment()
+            if not state.HasDocComment(identifier):
+                # Only test for documentation on identifiers with .s in them to
+                # avoid checking things like simple variables. We don't require
+                # documenting assignments to .prototype itself (bug 1880803).
+                if (not self._limited_doc_checks and has_dot and
+                    not state.InConstructor() and
+                    not identifier.endswith('.prototype')):
+                    comment = state.GetLastComment()
+                    if not (comment and comment.lower().count('jsdoc inherited')):
                         self._HandleError(
-                            errors.MISSING_BRACES_AROUND_TYPE,
-                            'Type must always be surrounded by curly braces.', token)
-
-        if token_type in (Type.DOC_FLAG, Type.DOC_INLINE_FLAG):
-            if (token.values['name'] not in state.GetDocFlag().LEGAL_DOC and
-                token.values['name'] not in self.custom_jsdoc_tags):
-                self._HandleError(
-                    errors.INVALID_JSDOC_TAG,
-                    'Invalid JsDoc tag: %s' % token.values['name'], token)
-
-            if (self.should_check(Rule.NO_BRACES_AROUND_INHERIT_DOC) and
-                token.values['name'] == 'inheritDoc' and
-                token_type == Type.DOC_INLINE_FLAG):
-                self._HandleError(errors.UNNECESSARY_BRACES_AROUND_INHERIT_DOC,
-                                  'Unnecessary braces around @inheritDoc',
-                                  token)
-
-        elif token_type == Type.SIMPLE_LVALUE:
-            identifier = token.values['identifier']
-
-            if ((not state.InFunction() or state.InConstructor()) and
-                state.InTopLevel() and not state.InObjectLiteralDescendant()):
-                jsdoc = state.GetDocComment()
-                if not state.HasDocComment(identifier):
-                    # Only test for documentation on identifiers with .s in them to
-                    # avoid checking things like simple variables. We don't require
-                    # documenting assignments to .prototype itself (bug 1880803).
-                    if (not state.InConstructor() and
-                        identifier.find('.') != -1 and not
-                        identifier.endswith('.prototype') and not
-                        self._limited_doc_checks):
-                        comment = state.GetLastComment()
-                        if not (comment and comment.lower().count('jsdoc inherited')):
-                            self._HandleError(
-                                errors.MISSING_MEMBER_DOCUMENTATION,
-                                "No docs found for member '%s'" % identifier,
-                                token)
-                elif jsdoc and (not state.InConstructor() or
-                                identifier.startswith('this.')):
-                    # We are at the top level and the function/member is documented.
-                    if identifier.endswith('_') and not identifier.endswith('__'):
-                        # Can have a private class which inherits documentation from a
-                        # public superclass.
-                        #
-                        # @inheritDoc is deprecated in favor of using @override, and they
-                        if (jsdoc.HasFlag('override') and not jsdoc.HasFlag('constructor')
-                            and ('accessControls' not in jsdoc.suppressions)):
+                            errors.MISSING_MEMBER_DOCUMENTATION,
+                            "No docs found for member '%s'" % identifier,
+                            token)
+            elif jsdoc and (not state.InConstructor() or
+                            identifier.startswith('this.')):
+                # We are at the top level and the function/member is documented.
+                is_private = jsdoc.HasFlag('private')
+                if identifier.endswith('_') and not identifier.endswith('__'):
+                    suppressions = jsdoc.suppressions
+                    has_override = jsdoc.HasFlag('override')
+                    has_inherit_doc = jsdoc.HasFlag('inheritDoc')
+                    access_controls_suppressed = 'accessControls' in suppressions
+                    underscore_suppressed = 'underscore' in suppressions
+
+                    # Can have a private class which inherits documentation from a
+                    # public superclass.
+                    #
+                    # @inheritDoc is deprecated in favor of using @override, and they
+                    if ((has_override or has_inherit_doc) and
+                            not access_controls_suppressed and
+                            not jsdoc.HasFlag('constructor')):
+                        if has_override:
                             self._HandleError(
                                 errors.INVALID_OVERRIDE_PRIVATE,
-                                '%s should not override a private member.' % identifier,
+                                '%s should not override a private member.' %
+                                identifier,
                                 jsdoc.GetFlag('override').flag_token)
-                        if (jsdoc.HasFlag('inheritDoc') and not jsdoc.HasFlag('constructor')
-                            and ('accessControls' not in jsdoc.suppressions)):
+                        if has_inherit_doc:
                             self._HandleError(
                                 errors.INVALID_INHERIT_DOC_PRIVATE,
-                                '%s should not inherit from a private member.' % identifier,
+                                '%s should not inherit from a private member.' %
+                                identifier,
                                 jsdoc.GetFlag('inheritDoc').flag_token)
-                        if (not jsdoc.HasFlag('private') and
-                            ('underscore' not in jsdoc.suppressions) and not
-                            ((jsdoc.HasFlag('inheritDoc') or jsdoc.HasFlag('override')) and
-                             ('accessControls' in jsdoc.suppressions))):
-                            self._HandleError(
-                                errors.MISSING_PRIVATE,
-                                'Member "%s" must have @private JsDoc.' %
-                                identifier, token)
-                        if jsdoc.HasFlag('private') and 'underscore' in jsdoc.suppressions:
-                            self._HandleError(
-                                errors.UNNECESSARY_SUPPRESS,
-                                '@suppress {underscore} is not necessary with @private',
-                                jsdoc.suppressions['underscore'])
-                    elif (jsdoc.HasFlag('private') and
-                          not self.InExplicitlyTypedLanguage()):
-                        # It is convention to hide public fields in some ECMA
-                        # implementations from documentation using the @private tag.
+                    if (not is_private and not underscore_suppressed and not
+                        ((has_inherit_doc or has_override) and
+                         access_controls_suppressed)):
                         self._HandleError(
-                            errors.EXTRA_PRIVATE,
-                            'Member "%s" must not have @private JsDoc' %
+                            errors.MISSING_PRIVATE,
+                            'Member "%s" must have @private JsDoc.' %
                             identifier, token)
-
-                    # These flags are only legal on localizable message definitions;
-                    # such variables always begin with the prefix MSG_.
-                    if not identifier.startswith('MSG_') and '.MSG_' not in identifier:
-                        for f in ('desc', 'hidden', 'meaning'):
-                            if jsdoc.HasFlag(f):
-                                self._HandleError(
-                                    errors.INVALID_USE_OF_DESC_TAG,
-                                    'Member "%s" does not start with MSG_ and thus '
-                                    'should not have @%s JsDoc' % (identifier, f),
-                                    token)
-
-            # Check for illegaly assigning live objects as prototype property values.
-            index = identifier.find('.prototype.')
-            # Ignore anything with additional .s after the prototype.
-            if index != -1 and identifier.find('.', index + 11) == -1:
-                equal_operator = tokenutil.SearchExcept(token, Type.NON_CODE_TYPES)
-                next_code = tokenutil.SearchExcept(equal_operator, Type.NON_CODE_TYPES)
-                if next_code and (
-                    next_code.type in (Type.START_BRACKET, Type.START_BLOCK) or
-                    next_code.IsOperator('new')):
-                    self._HandleError(
-                        errors.ILLEGAL_PROTOTYPE_MEMBER_VALUE,
-                        'Member %s cannot have a non-primitive value' % identifier,
-                        token)
-
-        elif token_type == Type.END_PARAMETERS:
-            # Find extra space at the end of parameter lists.  We check the token
-            # prior to the current one when it is a closing paren.
-            if (token.previous and token.previous.type == Type.PARAMETERS
-                and self.ENDS_WITH_SPACE.search(token.previous.string)):
-                self._HandleError(errors.EXTRA_SPACE, 'Extra space before ")"',
-                                  token.previous)
-
-            jsdoc = state.GetDocComment()
-            if state.GetFunction().is_interface:
-                if token.previous and token.previous.type == Type.PARAMETERS:
+                    if is_private and underscore_suppressed:
+                        self._HandleError(
+                            errors.UNNECESSARY_SUPPRESS,
+                            '@suppress {underscore} is not necessary with @private',
+                            suppressions['underscore'])
+                elif is_private and not self.InExplicitlyTypedLanguage():
+                    # It is convention to hide public fields in some ECMA
+                    # implementations from documentation using the @private tag.
                     self._HandleError(
-                        errors.INTERFACE_CONSTRUCTOR_CANNOT_HAVE_PARAMS,
-                        'Interface constructor cannot have parameters',
-                        token.previous)
-            elif (state.InTopLevel() and jsdoc and not jsdoc.HasFlag('see')
-                  and not jsdoc.InheritsDocumentation()
-                  and not state.InObjectLiteralDescendant() and not
-                  jsdoc.IsInvalidated()):
-                distance, edit = jsdoc.CompareParameters(state.GetParams())
-                if distance:
-                    params_iter = iter(state.GetParams())
-                    docs_iter = iter(jsdoc.ordered_params)
-
-                    for op in edit:
-                        if op == 'I':
-                            # Insertion.
-                            # Parsing doc comments is the same for all languages
-                            # but some languages care about parameters that don't have
-                            # doc comments and some languages don't care.
-                            # Languages that don't allow variables to by typed such as
-                            # JavaScript care but languages such as ActionScript or Java
-                            # that allow variables to be typed don't care.
-                            if not self._limited_doc_checks:
-                                self.HandleMissingParameterDoc(token, params_iter.next())
-
-                        elif op == 'D':
-                            # Deletion
-                            self._HandleError(errors.EXTRA_PARAMETER_DOCUMENTATION,
-                                              'Found docs for non-existing parameter: "%s"' %
-                                              docs_iter.next(), token)
-                        elif op == 'S':
-                            # Substitution
-                            if not self._limited_doc_checks:
-                                self._HandleError(
-                                    errors.WRONG_PARAMETER_DOCUMENTATION,
-                                    'Parameter mismatch: got "%s", expected "%s"' %
-                                    (params_iter.next(), docs_iter.next()), token)
-
-                        else:
-                            # Equality - just advance the iterators
-                            params_iter.next()
-                            docs_iter.next()
-
-        elif token_type == Type.STRING_TEXT:
-            # If this is the first token after the start of the string, but it's at
-            # the end of a line, we know we have a multi-line string.
-            if token.previous.type in (
-                Type.SINGLE_QUOTE_STRING_START,
-                Type.DOUBLE_QUOTE_STRING_START) and last_in_line:
-                self._HandleError(errors.MULTI_LINE_STRING,
-                                  'Multi-line strings are not allowed', token)
-
-        # This check is orthogonal to the ones above, and repeats some types, so
-        # it is a plain if and not an elif.
-        if token.type in Type.COMMENT_TYPES:
-            if self.ILLEGAL_TAB.search(token.string):
-                self._HandleError(errors.ILLEGAL_TAB,
-                                  'Illegal tab in comment "%s"' % token.string, token)
+                        errors.EXTRA_PRIVATE,
+                        'Member "%s" must not have @private JsDoc' %
+                        identifier, token)
+
+                # These flags are only legal on localizable message definitions;
+                # such variables always begin with the prefix MSG_.
+                if not identifier.startswith('MSG_') and '.MSG_' not in identifier:
+                    for f in _MSG_ONLY_FLAGS:
+                        if jsdoc.HasFlag(f):
+                            self._HandleError(
+                                errors.INVALID_USE_OF_DESC_TAG,
+                                'Member "%s" does not start with MSG_ and thus '
+                                'should not have @%s JsDoc' % (identifier, f),
+                                token)
 
-            trimmed = token.string.rstrip()
-            if last_in_line and token.string != trimmed:
-                # Check for extra whitespace at the end of a line.
+        # Check for illegaly assigning live objects as prototype property values.
+        if not has_dot:
+            return
+        index = identifier.find('.prototype.')
+        # Ignore anything with additional .s after the prototype.
+        if index != -1 and identifier.find('.', index + 11) == -1:
+            equal_operator = tokenutil.SearchExcept(token, Type.NON_CODE_TYPES)
+            next_code = tokenutil.SearchExcept(equal_operator, Type.NON_CODE_TYPES)
+            if next_code and (
+                next_code.type in (Type.START_BRACKET, Type.START_BLOCK) or
+                next_code.IsOperator('new')):
                 self._HandleError(
-                    errors.EXTRA_SPACE, 'Extra space at end of line', token,
-                    position=Position(len(trimmed), len(token.string) - len(trimmed)))
-
-        # This check is also orthogonal since it is based on metadata.
-        if token.metadata.is_implied_semicolon:
-            self._HandleError(errors.MISSING_SEMICOLON,
-                              'Missing semicolon at end of line', token)
+                    errors.ILLEGAL_PROTOTYPE_MEMBER_VALUE,
+                    'Member %s cannot have a non-primitive value' % identifier,
+                    token)
+
+    def _CheckEndParameters(self, token, state, first_in_line, last_in_line,
+                            last_non_space_token):
+        """Checks a parameter list against its documentation."""
+        # Find extra space at the end of parameter lists.  We check the token
+        # prior to the current one when it is a closing paren.
+        if (token.previous and token.previous.type is Type.PARAMETERS
+            and token.previous.string[-1:].isspace()):
+            self._HandleError(errors.EXTRA_SPACE, 'Extra space before ")"',
+                              token.previous)
+
+        jsdoc = state.GetDocComment()
+        if state.GetFunction().is_interface:
+            if token.previous and token.previous.type is Type.PARAMETERS:
+                self._HandleError(
+                    errors.INTERFACE_CONSTRUCTOR_CANNOT_HAVE_PARAMS,
+                    'Interface constructor cannot have parameters',
+                    token.previous)
+        elif (state.InTopLevel() and jsdoc and not jsdoc.HasFlag('see')
+              and not jsdoc.InheritsDocumentation()
+              and not state.InObjectLiteralDescendant() and not
+              jsdoc.IsInvalidated()):
+            params = state.GetParams()
+            distance, edit = jsdoc.CompareParameters(params)
+            if distance:
+                docs = jsdoc.ordered_params
+                param_index = 0
+                doc_index = 0
+
+                for op in edit:
+                    if op == 'I':
+                        # Insertion.
+                        # Parsing doc comments is the same for all languages
+                        # but some languages care about parameters that don't have
+                        # doc comments and some languages don't care.
+                        # Languages that don't allow variables to by typed such as
+                        # JavaScript care but languages such as ActionScript or Java
+                        # that allow variables to be typed don't care.
+                        if not self._limited_doc_checks:
+                            self.HandleMissingParameterDoc(
+                                token, params[param_index])
+                        param_index += 1
+
+                    elif op == 'D':
+                        # Deletion
+                        self._HandleError(errors.EXTRA_PARAMETER_DOCUMENTATION,
+                                          'Found docs for non-existing parameter: "%s"' %
+                                          docs[doc_index], token)
+                        doc_index += 1
+                    elif op == 'S':
+                        # Substitution
+                        if not self._limited_doc_checks:
+                            self._HandleError(
+                                errors.WRONG_PARAMETER_DOCUMENTATION,
+                                'Parameter mismatch: got "%s", expected "%s"' %
+                                (params[param_index], docs[doc_index]), token)
+                        param_index += 1
+                        doc_index += 1
 
-    def _HandleStartBracket(self, token, last_non_space_token):
+                    else:
+                        # Equality - just advance the indices
+                        param_index += 1
+                        doc_index += 1
+
+    def _CheckStringText(self, token, state, first_in_line, last_in_line,
+                         last_non_space_token):
+        """Checks for multi-line strings."""
+        # If this is the first token after the start of the string, but it's at
+        # the end of a line, we know we have a multi-line string.
+        if token.previous.type in (
+            Type.SINGLE_QUOTE_STRING_START,
+            Type.DOUBLE_QUOTE_STRING_START) and last_in_line:
+            self._HandleError(errors.MULTI_LINE_STRING,
+                              'Multi-line strings are not allowed', token)
+
+    def _HandleStartBracket(self, token, state, first_in_line, last_in_line,
+                            last_non_space_token):
         """Handles a token that is an open bracket.
 
         Args:
           token: The token to handle.
+          state: parser_state object that indicates the current state in the page
+          first_in_line: Whether the token is the first in its line.
+          last_in_line: Whether the token is the last in its line.
           last_non_space_token: The last token that was not a space.
         """
-        if (not token.IsFirstInLine() and token.previous.type == Type.WHITESPACE and
+        if (not token.IsFirstInLine() and
+            token.previous.type is Type.WHITESPACE and
             last_non_space_token and
-            last_non_space_token.type in Type.EXPRESSION_ENDER_TYPES):
+            last_non_space_token.type in _EXPRESSION_ENDER_TYPES):
             self._HandleError(
                 errors.EXTRA_SPACE, 'Extra space before "["',
                 token.previous, position=Position.All(token.previous.string))
@@ -823,9 +985,7 @@ class EcmaScriptLintRules(checkerbase.LintRulesBase):
         # should trigger a proper indentation warning message as [ is not indented
         # by four spaces.
         elif (not token.IsFirstInLine() and token.previous and
-              token.previous.type not in (
-                  [Type.WHITESPACE, Type.START_PAREN, Type.START_BRACKET] +
-                  Type.EXPRESSION_ENDER_TYPES)):
+              token.previous.type not in _NO_SPACE_BEFORE_BRACKET_TYPES):
             self._HandleError(errors.MISSING_SPACE, 'Missing space before "["',
                               token, position=Position.AtBeginning())
 
@@ -850,7 +1010,7 @@ class EcmaScriptLintRules(checkerbase.LintRulesBase):
 
         try:
             self._indentation.Finalize()
-        except Exception, e:
+        except Exception as e:
             self._HandleError(
                 errors.FILE_DOES_NOT_PARSE,
                 str(e),
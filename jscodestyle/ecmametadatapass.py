@@ -23,6 +23,8 @@ from jscodestyle import tokenutil
 
 TokenType = javascripttokens.JavaScriptTokenType
 
+_EXPRESSION_ENDER_TYPES = frozenset(TokenType.EXPRESSION_ENDER_TYPES)
+
 
 class ParseError(Exception):
     """Exception indicating a parse error at the given token.
@@ -188,6 +190,9 @@ class EcmaMetaData(object):
           tokens. This is set in aliaspass.py and is a best guess.
       is_alias_definition: True if the symbol is part of an alias definition.
           If so, these symbols won't be counted towards goog.requires/provides.
+      cached_identifier: The token and the result of
+          tokenutil.GetIdentifierForToken for it, as a pair, once computed.
+          The token is kept so metadata copied to a new token is not reused.
     """
 
     UNARY_OPERATOR = 'unary'
@@ -208,6 +213,7 @@ class EcmaMetaData(object):
         self.is_implied_block_close = False
         self.aliased_symbol = None
         self.is_alias_definition = False
+        self.cached_identifier = None
 
     def __repr__(self):
         """Returns a string representation of the context object."""
@@ -374,7 +380,7 @@ class EcmaMetaDataPass(object):
 
         elif token_type == TokenType.START_BRACKET:
             if (self._last_code and
-                self._last_code.type in TokenType.EXPRESSION_ENDER_TYPES):
+                self._last_code.type in _EXPRESSION_ENDER_TYPES):
                 self._AddContext(EcmaContext.INDEX)
             else:
                 self._AddContext(EcmaContext.ARRAY_LITERAL)
@@ -563,11 +569,11 @@ class EcmaMetaDataPass(object):
             return EcmaMetaData.UNARY_OPERATOR
 
         if (token.string in TokenType.UNARY_POST_OPERATORS and
-            last_code.type in TokenType.EXPRESSION_ENDER_TYPES):
+            last_code.type in _EXPRESSION_ENDER_TYPES):
             return EcmaMetaData.UNARY_POST_OPERATOR
 
         if (token.string in TokenType.UNARY_OK_OPERATORS and
-            last_code.type not in TokenType.EXPRESSION_ENDER_TYPES and
+            last_code.type not in _EXPRESSION_ENDER_TYPES and
             last_code.string not in TokenType.UNARY_POST_OPERATORS):
             return EcmaMetaData.UNARY_OPERATOR
 
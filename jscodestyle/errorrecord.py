@@ -18,6 +18,13 @@
 """A simple, pickle-serializable class to represent a lint error."""
 
 
+import cPickle
+import cStringIO
+import errno
+import hashlib
+import os
+import tempfile
+
 from jscodestyle import errors
 from jscodestyle.common import erroroutput
 from jscodestyle.common import erroraccumulator
@@ -33,11 +40,20 @@ class ErrorRecord(object):
       new_error: Whether this is a "new error" (see errors.NEW_ERRORS).
     """
 
+    __slots__ = ('path', 'error_string', 'new_error')
+
     def __init__(self, path, error_string, new_error):
         self.path = path
         self.error_string = error_string
         self.new_error = new_error
 
+    def __getstate__(self):
+        # Slotted classes have no __dict__ for the older pickle protocols.
+        return (self.path, self.error_string, self.new_error)
+
+    def __setstate__(self, state):
+        self.path, self.error_string, self.new_error = state
+
 
 def make_error_record(path, error, unix_mode=False):
     """Make an error record with correctly formatted error string.
@@ -63,6 +79,7 @@ def make_error_record(path, error, unix_mode=False):
 
     return ErrorRecord(path, error_string, new_error)
 
+
 def check_path(path,
                unix_mode,
                limited_doc_files,
@@ -77,15 +94,63 @@ def check_path(path,
                strict,
                jsdoc,
                disable,
-               max_line_length):
+               max_line_length,
+               source=None):
     """Check a path and return any errors.
 
     Args:
       path: paths to check.
+      source: Optional iterable of the file's lines, read from path if omitted.
 
     Returns:
       A list of errorrecord.ErrorRecords for any found errors.
     """
+    return list(check_path_iter(path,
+                                unix_mode,
+                                limited_doc_files,
+                                error_trace,
+                                closurized_namespaces,
+                                ignored_extra_namespaces,
+                                custom_jsdoc_tags,
+                                dot_on_next_line,
+                                check_trailing_comma,
+                                debug_indentation,
+                                jslint_error,
+                                strict,
+                                jsdoc,
+                                disable,
+                                max_line_length,
+                                source))
+
+
+def check_path_iter(path,
+                    unix_mode,
+                    limited_doc_files,
+                    error_trace,
+                    closurized_namespaces,
+                    ignored_extra_namespaces,
+                    custom_jsdoc_tags,
+                    dot_on_next_line,
+                    check_trailing_comma,
+                    debug_indentation,
+                    jslint_error,
+                    strict,
+                    jsdoc,
+                    disable,
+                    max_line_length,
+                    source=None):
+    """Check a path and yield any errors.
+
+    Unlike check_path, the records are not collected into a list, so callers
+    in the same process can handle each one as it is made.
+
+    Args:
+      path: paths to check.
+      source: Optional iterable of the file's lines, read from path if omitted.
+
+    Yields:
+      errorrecord.ErrorRecords for any found errors.
+    """
     if not limited_doc_files:
         limited_doc_files = []
 
@@ -93,7 +158,7 @@ def check_path(path,
 
     runner.Run(path,
                error_handler,
-               None,
+               source,
                limited_doc_files,
                error_trace,
                closurized_namespaces,
@@ -108,11 +173,98 @@ def check_path(path,
                disable,
                max_line_length)
 
-    make_error_fn = lambda err: make_error_record(
-        path,
-        err,
-        unix_mode)
-    return map(make_error_fn, error_handler.GetErrors())
+    for err in error_handler.GetErrors():
+        yield make_error_record(path, err, unix_mode)
+
+
+_linter_fingerprint = None
+
+
+def _get_linter_fingerprint():
+    """Returns a string identifying the installed linter source.
+
+    Cached results are keyed on this so that upgrading or editing the linter
+    invalidates them.
+    """
+    global _linter_fingerprint
+    if _linter_fingerprint is None:
+        package_dir = os.path.dirname(os.path.abspath(__file__))
+        fingerprint = hashlib.sha1()
+        for dirpath, dirnames, filenames in os.walk(package_dir):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                if filename.endswith('.py'):
+                    stat = os.stat(os.path.join(dirpath, filename))
+                    fingerprint.update('%s:%d:%d;' % (
+                        filename, stat.st_size, stat.st_mtime))
+        _linter_fingerprint = fingerprint.hexdigest()
+    return _linter_fingerprint
+
+
+def cached_check_path(path, cache_dir, check_fn):
+    """Check a path, reusing the records of an earlier identical check.
+
+    Results are stored in cache_dir under a hash of the file contents, the
+    path, the options bound to check_fn and the linter source, so a file is
+    only checked again when one of those changes.
+
+    Args:
+      path: path to check.
+      cache_dir: Directory in which to keep cached results.
+      check_fn: A functools.partial of check_path or check_path_iter binding
+          every option but the path and source.
+
+    Returns:
+      A list of errorrecord.ErrorRecords for any found errors.
+    """
+    try:
+        with open(path, 'rb') as source_file:
+            source = source_file.read()
+    except IOError:
+        # Let the check itself report the unreadable file.
+        return list(check_fn(path))
+
+    key = hashlib.sha1()
+    key.update(_get_linter_fingerprint())
+    key.update(repr(sorted(check_fn.keywords.items())))
+    key.update(repr(path))
+    key.update(source)
+    key = key.hexdigest()
+
+    entry_dir = os.path.join(cache_dir, key[:2])
+    entry_path = os.path.join(entry_dir, key)
+
+    try:
+        with open(entry_path, 'rb') as entry:
+            return cPickle.load(entry)
+    except Exception:  # pylint: disable=broad-except
+        # A missing, truncated or otherwise unreadable entry is a cache miss.
+        pass
+
+    # Check the contents already read rather than reading the file again.
+    records = list(check_fn(path, source=cStringIO.StringIO(source)))
+
+    try:
+        os.makedirs(entry_dir)
+    except OSError as err:
+        if err.errno != errno.EEXIST:
+            return records
+
+    # Write to a temporary file first so that concurrent runs never read a
+    # partially written entry.
+    try:
+        handle, temp_path = tempfile.mkstemp(dir=entry_dir)
+    except OSError:
+        return records
+
+    try:
+        with os.fdopen(handle, 'wb') as entry:
+            cPickle.dump(records, entry, cPickle.HIGHEST_PROTOCOL)
+        os.rename(temp_path, entry_path)
+    except (IOError, OSError):
+        os.remove(temp_path)
+
+    return records
 
 
 # TODO: integrate it with above check_path
@@ -31,6 +31,42 @@ Position = position.Position
 Type = javascripttokens.JavaScriptTokenType
 
 
+# Maps each closing token type to the opening type it pops the stack to.
+_START_TYPE_BY_END_TYPE = {
+    Type.END_PAREN: Type.START_PAREN,
+    Type.END_PARAMETERS: Type.START_PARAMETERS,
+    Type.END_BRACKET: Type.START_BRACKET,
+}
+
+# Tokens that can have a hard stop after them, as in indentation lined up with
+# (, [, return or ?, mapped to the hard stop's offset from the token.
+# Assignments also have a hard stop, one character after the operator.
+_HARD_STOP_OFFSETS = {
+    Type.START_PAREN: 1,
+    Type.START_PARAMETERS: 1,
+    Type.START_BRACKET: 1,
+}
+
+_HARD_STOP_STRING_OFFSETS = {
+    'return': 7,
+    '?': 2,
+}
+
+# Required ending of the line that closes a goog.scope block.
+_GOOG_SCOPE_END = ';  // goog.scope\n'
+
+# Token types that never affect indentation apart from closing implied blocks.
+_WHITESPACE_TYPES = frozenset([Type.WHITESPACE, Type.BLANK_LINE])
+
+# Token types whose line indentation is not checked.
+_UNCHECKED_TYPES = frozenset([Type.COMMENT, Type.DOC_PREFIX, Type.STRING_TEXT])
+
+# Token types allowed in a function declaration assigned to a property.
+_FUNCTION_DECLARATION_TYPES = frozenset([
+    Type.FUNCTION_DECLARATION, Type.PARAMETERS, Type.START_PARAMETERS,
+    Type.END_PARAMETERS, Type.END_PAREN])
+
+
 # The general approach:
 #
 # 1. Build a stack of tokens that can affect indentation.
@@ -47,6 +83,27 @@ Type = javascripttokens.JavaScriptTokenType
 #    allowable indentations for each stack.  We follows the general
 #    "no false positives" approach of GJsLint and build the most permissive
 #    set possible.
+#
+#    Allowable indentations are small non-negative integers, so a set of them
+#    is stored as an integer bitmask with bit N set when an indentation of N
+#    is allowed.  Adding to every indentation in the set is then a shift.
+
+
+def _GetIndentationsFromMask(mask):
+    """Returns the sorted list of indentations in the given bitmask.
+
+    Args:
+      mask: A bitmask of indentations.
+
+    Returns:
+      The indentations whose bits are set, in increasing order.
+    """
+    indentations = []
+    while mask:
+        lowest_bit = mask & -mask
+        indentations.append(lowest_bit.bit_length() - 1)
+        mask ^= lowest_bit
+    return indentations
 
 
 class TokenInfo(object):
@@ -59,6 +116,8 @@ class TokenInfo(object):
         finding a matching end token.
       overridden_by: TokenInfo for a token that overrides the indentation that
         this token would require.
+      overridden_children: TokenInfos on the stack that this token has
+        overridden, so the overrides can be undone when it is removed.
       is_permanent_override: Whether the override on this token should persist
         even after the overriding token is removed from the stack.  For example:
         x([
@@ -71,6 +130,10 @@ class TokenInfo(object):
         operator.
     """
 
+    __slots__ = ('token', 'overridden_by', 'overridden_children',
+                 'is_permanent_override', 'is_block', 'is_transient',
+                 'line_number')
+
     def __init__(self, token, is_block=False):
         """Initializes a TokenInfo object.
 
@@ -80,6 +143,7 @@ class TokenInfo(object):
         """
         self.token = token
         self.overridden_by = None
+        self.overridden_children = []
         self.is_permanent_override = False
         self.is_block = is_block
         self.is_transient = not is_block and token.type not in (
@@ -111,6 +175,28 @@ class IndentationRules(object):
         # Map from line number to number of characters it is off in indentation.
         self._start_index_offset = {}
 
+        # Handlers for tokens that could decrease indentation, called with the
+        # token and the list of indentation errors before the token is checked.
+        self._decrease_indentation_handlers = {
+            Type.SEMICOLON: self._HandleSemicolon,
+            Type.END_PAREN: self._HandleEndGroup,
+            Type.END_PARAMETERS: self._HandleEndGroup,
+            Type.END_BRACKET: self._HandleEndGroup,
+            Type.END_BLOCK: self._HandleEndBlock,
+            Type.KEYWORD: self._HandleCaseKeyword,
+        }
+
+        # Handlers for tokens that could increase indentation, called with the
+        # token after it is checked.
+        self._increase_indentation_handlers = {
+            Type.OPERATOR: self._HandleOperator,
+            Type.START_PAREN: self._HandleStartParen,
+            Type.START_PARAMETERS: self._HandleStartParen,
+            Type.START_BLOCK: self._HandleStartBlock,
+            Type.START_BRACKET: self._HandleStartBracket,
+            Type.KEYWORD: self._HandleReturnKeyword,
+        }
+
     def Finalize(self):
         if self._stack:
             old_stack = self._stack
@@ -131,55 +217,25 @@ class IndentationRules(object):
         """
 
         token_type = token.type
+        metadata = token.metadata
+
+        # Whitespace can only close an implied block, so skip the other checks.
+        if token_type in _WHITESPACE_TYPES:
+            if metadata.is_implied_block_close:
+                self._PopToImpliedBlock()
+            return []
+
+        token_string = token.string
         indentation_errors = []
         stack = self._stack
-        is_first = self._IsFirstNonWhitespaceTokenInLine(token)
 
         # Add tokens that could decrease indentation before checking.
-        if token_type == Type.END_PAREN:
-            self._PopTo(Type.START_PAREN)
-
-        elif token_type == Type.END_PARAMETERS:
-            self._PopTo(Type.START_PARAMETERS)
-
-        elif token_type == Type.END_BRACKET:
-            self._PopTo(Type.START_BRACKET)
-
-        elif token_type == Type.END_BLOCK:
-            start_token = self._PopTo(Type.START_BLOCK)
-            # Check for required goog.scope comment.
-            if start_token:
-                goog_scope = tokenutil.GoogScopeOrNoneFromStartBlock(start_token.token)
-                if goog_scope is not None:
-                    if not token.line.endswith(';  // goog.scope\n'):
-                        if (token.line.find('//') > -1 and
-                            token.line.find('goog.scope') >
-                            token.line.find('//')):
-                            indentation_errors.append([
-                                errors.MALFORMED_END_OF_SCOPE_COMMENT,
-                                ('Malformed end of goog.scope comment. Please use the '
-                                 'exact following syntax to close the scope:\n'
-                                 '});  // goog.scope'),
-                                token,
-                                Position(token.start_index, token.length)])
-                        else:
-                            indentation_errors.append([
-                                errors.MISSING_END_OF_SCOPE_COMMENT,
-                                ('Missing comment for end of goog.scope which opened at line '
-                                 '%d. End the scope with:\n'
-                                 '});  // goog.scope' %
-                                 (start_token.line_number)),
-                                token,
-                                Position(token.start_index, token.length)])
-
-        elif token_type == Type.KEYWORD and token.string in ('case', 'default'):
-            self._Add(self._PopTo(Type.START_BLOCK))
-
-        elif token_type == Type.SEMICOLON:
-            self._PopTransient()
+        handler = self._decrease_indentation_handlers.get(token_type)
+        if handler:
+            handler(token, indentation_errors)
 
-        if (is_first and
-            token_type not in (Type.COMMENT, Type.DOC_PREFIX, Type.STRING_TEXT)):
+        if (token_type not in _UNCHECKED_TYPES and
+            self._IsFirstNonWhitespaceTokenInLine(token)):
             if self.debug_indentation:
                 print 'Line #%d: stack %r' % (token.line_number, stack)
 
@@ -199,10 +255,10 @@ class IndentationRules(object):
                     next_code = tokenutil.SearchExcept(next_code, Type.NON_CODE_TYPES)
                 if next_code and next_code.string in ('else', 'case', 'default'):
                     # TODO(robbyw): This almost certainly introduces false negatives.
-                    expected |= self._AddToEach(expected, -2)
+                    expected |= expected >> 2
 
-            if actual >= 0 and actual not in expected:
-                expected = sorted(expected)
+            if actual >= 0 and not (expected >> actual) & 1:
+                expected = _GetIndentationsFromMask(expected)
                 indentation_errors.append([
                     errors.WRONG_INDENTATION,
                     'Wrong indentation: expected any of {%s} but got %d' % (
@@ -212,42 +268,31 @@ class IndentationRules(object):
                 self._start_index_offset[token.line_number] = expected[0] - actual
 
         # Add tokens that could increase indentation.
-        if token_type == Type.START_BRACKET:
-            self._Add(TokenInfo(
-                token=token,
-                is_block=token.metadata.context.type == Context.ARRAY_LITERAL))
-
-        elif token_type == Type.START_BLOCK or token.metadata.is_implied_block:
-            self._Add(TokenInfo(token=token, is_block=True))
-
-        elif token_type in (Type.START_PAREN, Type.START_PARAMETERS):
-            self._Add(TokenInfo(token=token, is_block=False))
-
-        elif token_type == Type.KEYWORD and token.string == 'return':
-            self._Add(TokenInfo(token))
-
-        elif not token.IsLastInLine() and (
-            token.IsAssignment() or token.IsOperator('?')):
-            self._Add(TokenInfo(token=token))
+        if metadata.is_implied_block and token_type != Type.START_BRACKET:
+            self._HandleStartBlock(token)
+        else:
+            handler = self._increase_indentation_handlers.get(token_type)
+            if handler:
+                handler(token)
 
         # Handle implied block closes.
-        if token.metadata.is_implied_block_close:
+        if metadata.is_implied_block_close:
             self._PopToImpliedBlock()
 
         # Add some tokens only if they appear at the end of the line.
         is_last = self._IsLastCodeInLine(token)
         if is_last:
-            next_code_token = tokenutil.GetNextCodeToken(token)
             # Increase required indentation if this is an overlong wrapped statement
             # ending in an operator.
             if token_type == Type.OPERATOR:
-                if token.string == ':':
+                context_type = metadata.context.type
+                if token_string == ':':
                     if stack and stack[-1].token.string == '?':
                         # When a ternary : is on a different line than its '?', it doesn't
                         # add indentation.
                         if token.line_number == stack[-1].token.line_number:
                             self._Add(TokenInfo(token))
-                    elif token.metadata.context.type == Context.CASE_BLOCK:
+                    elif context_type == Context.CASE_BLOCK:
                         # Pop transient tokens from say, line continuations, e.g.,
                         # case x.
                         #     y:
@@ -256,7 +301,7 @@ class IndentationRules(object):
                         # Starting the body of the case statement, which is a type of
                         # block.
                         self._Add(TokenInfo(token=token, is_block=True))
-                    elif token.metadata.context.type == Context.LITERAL_ELEMENT:
+                    elif context_type == Context.LITERAL_ELEMENT:
                         # When in an object literal, acts as operator indicating line
                         # continuations.
                         self._Add(TokenInfo(token))
@@ -265,47 +310,101 @@ class IndentationRules(object):
                         # this case.
                         pass
 
-                elif token.string != ',':
+                elif token_string != ',':
                     self._Add(TokenInfo(token))
                 else:
                     # The token is a comma.
-                    if token.metadata.context.type == Context.VAR:
+                    if context_type == Context.VAR:
                         self._Add(TokenInfo(token))
-                    elif token.metadata.context.type != Context.PARAMETERS:
+                    elif context_type != Context.PARAMETERS:
                         self._PopTransient()
             # Increase required indentation if this is the end of a statement that's
             # continued with an operator on the next line (e.g. the '.').
-            elif (next_code_token and next_code_token.type == Type.OPERATOR and
-                  not next_code_token.metadata.IsUnaryOperator()):
+            elif self._IsContinuedByOperator(token):
                 self._Add(TokenInfo(token))
-            elif token_type == Type.PARAMETERS and token.string.endswith(','):
+            elif token_type == Type.PARAMETERS and token_string.endswith(','):
                 # Parameter lists.
                 self._Add(TokenInfo(token))
             elif token.IsKeyword('var'):
                 self._Add(TokenInfo(token))
-            elif token.metadata.is_implied_semicolon:
+            elif metadata.is_implied_semicolon:
                 self._PopTransient()
         elif token.IsAssignment():
             self._Add(TokenInfo(token))
 
         return indentation_errors
 
-    def _AddToEach(self, original, amount):
-        """Returns a new set with the given amount added to each element.
+    def _HandleSemicolon(self, token, indentation_errors):
+        """Pops transient tokens at the end of a statement."""
+        self._PopTransient()
 
-        Args:
-          original: The original set of numbers
-          amount: The amount to add to each element
+    def _HandleEndGroup(self, token, indentation_errors):
+        """Pops the stack to the start of a closed paren, parameters or bracket."""
+        self._PopTo(_START_TYPE_BY_END_TYPE[token.type])
 
-        Returns:
-          A new set containing each element of the original set added to the amount.
+    def _HandleEndBlock(self, token, indentation_errors):
+        """Pops the stack to the start of a block and checks goog.scope closes.
+
+        Args:
+          token: The END_BLOCK token.
+          indentation_errors: The list of errors to add to.
         """
-        return set([x + amount for x in original])
+        start_token = self._PopTo(Type.START_BLOCK)
+        # Check for required goog.scope comment.
+        if start_token:
+            goog_scope = tokenutil.GoogScopeOrNoneFromStartBlock(start_token.token)
+            if goog_scope is not None:
+                line = token.line
+                if not line.endswith(_GOOG_SCOPE_END):
+                    comment_index = line.find('//')
+                    if (comment_index > -1 and
+                        line.find('goog.scope') > comment_index):
+                        indentation_errors.append([
+                            errors.MALFORMED_END_OF_SCOPE_COMMENT,
+                            ('Malformed end of goog.scope comment. Please use the '
+                             'exact following syntax to close the scope:\n'
+                             '});  // goog.scope'),
+                            token,
+                            Position(token.start_index, token.length)])
+                    else:
+                        indentation_errors.append([
+                            errors.MISSING_END_OF_SCOPE_COMMENT,
+                            ('Missing comment for end of goog.scope which opened at line '
+                             '%d. End the scope with:\n'
+                             '});  // goog.scope' %
+                             (start_token.line_number)),
+                            token,
+                            Position(token.start_index, token.length)])
+
+    def _HandleCaseKeyword(self, token, indentation_errors):
+        """Starts a new case block at case and default keywords."""
+        if token.string in ('case', 'default'):
+            self._Add(self._PopTo(Type.START_BLOCK))
+
+    def _HandleStartBracket(self, token):
+        """Adds an array literal block or a bracket continuation."""
+        self._Add(TokenInfo(
+            token=token,
+            is_block=token.metadata.context.type == Context.ARRAY_LITERAL))
 
-    _HARD_STOP_TYPES = (Type.START_PAREN, Type.START_PARAMETERS,
-                        Type.START_BRACKET)
+    def _HandleStartBlock(self, token):
+        """Adds a block, either explicit or implied."""
+        self._Add(TokenInfo(token=token, is_block=True))
 
-    _HARD_STOP_STRINGS = ('return', '?')
+    def _HandleStartParen(self, token):
+        """Adds an opening paren or parameter list."""
+        self._Add(TokenInfo(token=token, is_block=False))
+
+    def _HandleReturnKeyword(self, token):
+        """Adds return keywords, which can be followed by a hard stop."""
+        if token.string == 'return':
+            self._Add(TokenInfo(token))
+
+    def _HandleOperator(self, token):
+        """Adds assignments and ternary operators that do not end the line."""
+        if not token.IsLastInLine() and (
+            token.IsAssignment() or token.IsOperator('?')):
+            self._Add(TokenInfo(token=token))
 
     def _IsHardStop(self, token):
         """Determines if the given token can have a hard stop after it.
@@ -319,18 +418,19 @@ class IndentationRules(object):
         Hard stops are indentations defined by the position of another token as in
         indentation lined up with return, (, [, and ?.
         """
-        return (token.type in self._HARD_STOP_TYPES or
-                token.string in self._HARD_STOP_STRINGS or
+        return (token.type in _HARD_STOP_OFFSETS or
+                token.string in _HARD_STOP_STRING_OFFSETS or
                 token.IsAssignment())
 
     def _GetAllowableIndentations(self):
         """Computes the set of allowable indentations.
 
         Returns:
-          The set of allowable indentations, given the current stack.
+          The set of allowable indentations, given the current stack, as a
+          bitmask.
         """
-        expected = set([0])
-        hard_stops = set([])
+        expected = 1
+        hard_stops = 0
 
         # Whether the tokens are still in the same continuation, meaning additional
         # indentation is optional.  As an example:
@@ -342,54 +442,56 @@ class IndentationRules(object):
 
         for token_info in self._stack:
             token = token_info.token
+            token_type = token.type
+            token_string = token.string
+            overridden_by = token_info.overridden_by
 
             # Handle normal additive indentation tokens.
-            if not token_info.overridden_by and token.string != 'return':
+            if not overridden_by and token_string != 'return':
                 if token_info.is_block:
-                    expected = self._AddToEach(expected, 2)
-                    hard_stops = self._AddToEach(hard_stops, 2)
+                    expected <<= 2
+                    hard_stops <<= 2
                     in_same_continuation = False
                 elif in_same_continuation:
-                    expected |= self._AddToEach(expected, 4)
-                    hard_stops |= self._AddToEach(hard_stops, 4)
+                    expected |= expected << 4
+                    hard_stops |= hard_stops << 4
                 else:
-                    expected = self._AddToEach(expected, 4)
-                    hard_stops |= self._AddToEach(hard_stops, 4)
+                    expected <<= 4
+                    hard_stops |= hard_stops << 4
                     in_same_continuation = True
 
             # Handle hard stops after (, [, return, =, and ?
-            if self._IsHardStop(token):
-                override_is_hard_stop = (token_info.overridden_by and
-                                         self._IsHardStop(
-                                             token_info.overridden_by.token))
-                if token.type == Type.START_PAREN and token.previous:
-                    # For someFunction(...) we allow to indent at the beginning of the
-                    # identifier +4
-                    prev = token.previous
-                    if (prev.type == Type.IDENTIFIER and
-                        prev.line_number == token.line_number):
-                        hard_stops.add(prev.start_index + 4)
-                if not override_is_hard_stop:
-                    start_index = token.start_index
-                    if token.line_number in self._start_index_offset:
-                        start_index += self._start_index_offset[token.line_number]
-                    if (token.type in (Type.START_PAREN, Type.START_PARAMETERS) and
-                        not token_info.overridden_by):
-                        hard_stops.add(start_index + 1)
-
-                    elif token.string == 'return' and not token_info.overridden_by:
-                        hard_stops.add(start_index + 7)
-
-                    elif token.type == Type.START_BRACKET:
-                        hard_stops.add(start_index + 1)
-
-                    elif token.IsAssignment():
-                        hard_stops.add(start_index + len(token.string) + 1)
-
-                    elif token.IsOperator('?') and not token_info.overridden_by:
-                        hard_stops.add(start_index + 2)
-
-        return (expected | hard_stops) or set([0])
+            if token_type in _HARD_STOP_OFFSETS:
+                hard_stop_offset = _HARD_STOP_OFFSETS[token_type]
+            elif token_string in _HARD_STOP_STRING_OFFSETS:
+                hard_stop_offset = _HARD_STOP_STRING_OFFSETS[token_string]
+            elif token.IsAssignment():
+                hard_stop_offset = len(token_string) + 1
+            else:
+                continue
+
+            if token_type == Type.START_PAREN and token.previous:
+                # For someFunction(...) we allow to indent at the beginning of the
+                # identifier +4
+                prev = token.previous
+                if (prev.type == Type.IDENTIFIER and
+                    prev.line_number == token.line_number):
+                    hard_stops |= 1 << (prev.start_index + 4)
+
+            # Any override removes the hard stop, except that brackets and
+            # assignments keep theirs unless the override is a hard stop too.
+            if overridden_by and (
+                    self._IsHardStop(overridden_by.token) or
+                    not (token_type == Type.START_BRACKET or
+                         token.IsAssignment())):
+                continue
+
+            start_index = token.start_index
+            if token.line_number in self._start_index_offset:
+                start_index += self._start_index_offset[token.line_number]
+            hard_stops |= 1 << (start_index + hard_stop_offset)
+
+        return (expected | hard_stops) or 1
 
     def _GetActualIndentation(self, token):
         """Gets the actual indentation of the line containing the given token.
@@ -424,7 +526,7 @@ class IndentationRules(object):
         Returns:
           True if the token is the first non-whitespace token on its line.
         """
-        if token.type in (Type.WHITESPACE, Type.BLANK_LINE):
+        if token.type in _WHITESPACE_TYPES:
             return False
         if token.IsFirstInLine():
             return True
@@ -442,14 +544,29 @@ class IndentationRules(object):
         """
         if token.type in Type.NON_CODE_TYPES:
             return False
-        start_token = token
+        # Only the non-code tokens up to the next code token are walked, so the
+        # total work per line is linear.
+        line_number = token.line_number
         while True:
             token = token.next
-            if not token or token.line_number != start_token.line_number:
+            if not token or token.line_number != line_number:
                 return True
             if token.type not in Type.NON_CODE_TYPES:
                 return False
 
+    def _IsContinuedByOperator(self, token):
+        """Determines if the next code token is a binary or postfix operator.
+
+        Args:
+          token: The token.
+
+        Returns:
+          True if the code after the token starts with a non-unary operator.
+        """
+        next_code_token = tokenutil.GetNextCodeToken(token)
+        return bool(next_code_token and next_code_token.type == Type.OPERATOR and
+                    not next_code_token.metadata.IsUnaryOperator())
+
     def _AllFunctionPropertyAssignTokens(self, start_token, end_token):
         """Checks if tokens are (likely) a valid function property assignment.
 
@@ -462,12 +579,7 @@ class IndentationRules(object):
           within a function declaration and assignment into a property.
         """
         for token in tokenutil.GetTokenRange(start_token, end_token):
-            fn_decl_tokens = (Type.FUNCTION_DECLARATION,
-                              Type.PARAMETERS,
-                              Type.START_PARAMETERS,
-                              Type.END_PARAMETERS,
-                              Type.END_PAREN)
-            if (token.type not in fn_decl_tokens and
+            if (token.type not in _FUNCTION_DECLARATION_TYPES and
                 token.IsCode() and
                 not tokenutil.IsIdentifierOrDot(token) and
                 not token.IsAssignment() and
@@ -510,6 +622,7 @@ class IndentationRules(object):
                             break
                         stack_info.overridden_by = token_info
                         stack_info.is_permanent_override = True
+                        token_info.overridden_children.append(stack_info)
                         last_token = stack_info.token
 
             index = len(self._stack) - 1
@@ -521,6 +634,7 @@ class IndentationRules(object):
                     # In general, tokens only override each other when they are on
                     # the same line.
                     stack_info.overridden_by = token_info
+                    token_info.overridden_children.append(stack_info)
                     if (token_info.token.type == Type.START_BLOCK and
                         (stack_token.IsAssignment() or
                          stack_token.type in (Type.IDENTIFIER, Type.START_PAREN))):
@@ -600,10 +714,11 @@ class IndentationRules(object):
         Args:
           token_info: The token that is being removed from the stack.
         """
-        for stack_token in self._stack:
-            if (stack_token.overridden_by == token_info and
+        for stack_token in token_info.overridden_children:
+            if (stack_token.overridden_by is token_info and
                 not stack_token.is_permanent_override):
                 stack_token.overridden_by = None
+        del token_info.overridden_children[:]
 
     def _PopTransient(self):
         """Pops all transient tokens - i.e. not blocks, literals, or parens."""
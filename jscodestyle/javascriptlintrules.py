@@ -41,6 +41,15 @@ Type = javascripttokens.JavaScriptTokenType
 class JavaScriptLintRules(ecmalintrules.EcmaScriptLintRules):
     """JavaScript lint rules that catch JavaScript specific style errors."""
 
+    __slots__ = ('_namespaces_info', '_check_unused_local_variables',
+                 '_check_unused_private_members',
+                 '_declared_private_member_tokens', '_declared_private_members',
+                 '_used_private_members', '_unused_local_variables_by_scope',
+                 '_javascript_token_handlers')
+
+    # Matches private members assigned directly on this.
+    THIS_PRIVATE_MEMBER = re.compile(r'^this\.[a-zA-Z_]+$')
+
     def __init__(self,
                  namespaces_info,
                  error_handler,
@@ -70,6 +79,10 @@ class JavaScriptLintRules(ecmalintrules.EcmaScriptLintRules):
             strict,
             max_line_length)
         self._namespaces_info = namespaces_info
+        self._check_unused_local_variables = self.should_check(
+            Rule.UNUSED_LOCAL_VARIABLES)
+        self._check_unused_private_members = self.should_check(
+            Rule.UNUSED_PRIVATE_MEMBERS)
         self._declared_private_member_tokens = {}
         self._declared_private_members = set()
         self._used_private_members = set()
@@ -77,6 +90,16 @@ class JavaScriptLintRules(ecmalintrules.EcmaScriptLintRules):
         # dictionary is keyed by an identifier that defines a local variable and has
         # a token as its value.
         self._unused_local_variables_by_scope = []
+        self._javascript_token_handlers = {
+            Type.DOC_FLAG: self._CheckParamAndTypeFlag,
+            Type.DOUBLE_QUOTE_STRING_START: self._CheckDoubleQuotedString,
+            Type.END_DOC_COMMENT: self._CheckEndDocComment,
+            Type.END_BLOCK: self._CheckFunctionClose,
+            Type.IDENTIFIER: self._CheckClosureIdentifier,
+            Type.OPERATOR: self._CheckSpaceAfterOperator,
+            Type.WHITESPACE: self._CheckSpaceAfterOpening,
+            Type.SEMICOLON: self._CheckEmptyStatement,
+        }
 
     def HandleMissingParameterDoc(self, token, param_name):
         """Handle errors associated with a parameter missing a param tag."""
@@ -98,10 +121,10 @@ class JavaScriptLintRules(ecmalintrules.EcmaScriptLintRules):
         # Store some convenience variables
         namespaces_info = self._namespaces_info
 
-        if self.should_check(Rule.UNUSED_LOCAL_VARIABLES):
+        if self._check_unused_local_variables:
             self._CheckUnusedLocalVariables(token, state)
 
-        if self.should_check(Rule.UNUSED_PRIVATE_MEMBERS):
+        if self._check_unused_private_members:
             # Find all assignments to private members.
             if token.type == Type.SIMPLE_LVALUE:
                 identifier = token.string
@@ -120,8 +143,8 @@ class JavaScriptLintRules(ecmalintrules.EcmaScriptLintRules):
                             provided_namespaces = set()
 
                         # Skip cases of this.something_.somethingElse_.
-                        regex = re.compile(r'^this\.[a-zA-Z_]+$')
-                        if namespace in provided_namespaces or regex.match(identifier):
+                        if (namespace in provided_namespaces or
+                                self.THIS_PRIVATE_MEMBER.match(identifier)):
                             variable = identifier.split('.')[-1]
                             self._declared_private_member_tokens[variable] = token
                             self._declared_private_members.add(variable)
@@ -137,403 +160,459 @@ class JavaScriptLintRules(ecmalintrules.EcmaScriptLintRules):
                     if piece.endswith('_'):
                         self._used_private_members.add(piece)
 
-        if token.type == Type.DOC_FLAG:
-            flag = token.attached_object
+        handler = self._javascript_token_handlers.get(token.type)
+        if handler:
+            handler(token, state)
 
-            if flag.flag_type == 'param' and flag.name_token is not None:
-                self._CheckForMissingSpaceBeforeToken(
-                    token.attached_object.name_token)
-
-                if flag.type is not None and flag.name is not None:
-                    if self.should_check(Rule.VARIABLE_ARG_MARKER):
-                        # Check for variable arguments marker in type.
-                        if flag.jstype.IsVarArgsType() and flag.name != 'var_args':
-                            self._HandleError(errors.JSDOC_MISSING_VAR_ARGS_NAME,
-                                              'Variable length argument %s must be renamed '
-                                              'to var_args.' % flag.name,
-                                              token)
-                        elif not flag.jstype.IsVarArgsType() and flag.name == 'var_args':
-                            self._HandleError(errors.JSDOC_MISSING_VAR_ARGS_TYPE,
-                                              'Variable length argument %s type must start '
-                                              'with \'...\'.' % flag.name,
-                                              token)
-
-                    if self.should_check(Rule.OPTIONAL_TYPE_MARKER):
-                        # Check for optional marker in type.
-                        if (flag.jstype.opt_arg and
-                            not flag.name.startswith('opt_')):
-                            self._HandleError(errors.JSDOC_MISSING_OPTIONAL_PREFIX,
-                                              'Optional parameter name %s must be prefixed '
-                                              'with opt_.' % flag.name,
-                                              token)
-                        elif (not flag.jstype.opt_arg and
-                              flag.name.startswith('opt_')):
-                            self._HandleError(errors.JSDOC_MISSING_OPTIONAL_TYPE,
-                                              'Optional parameter %s type must end with =.' %
-                                              flag.name,
-                                              token)
-
-            if flag.flag_type in state.GetDocFlag().HAS_TYPE:
-                # Check for both missing type token and empty type braces '{}'
-                # Missing suppress types are reported separately and we allow enums,
-                # const, private, public and protected without types.
-                if (flag.flag_type not in state.GetDocFlag().CAN_OMIT_TYPE
-                    and (not flag.jstype or flag.jstype.IsEmpty())):
-                    self._HandleError(errors.MISSING_JSDOC_TAG_TYPE,
-                                      'Missing type in %s tag' % token.string, token)
-
-                elif flag.name_token and flag.type_end_token and tokenutil.Compare(
-                    flag.type_end_token, flag.name_token) > 0:
-                    self._HandleError(
-                        errors.OUT_OF_ORDER_JSDOC_TAG_TYPE,
-                        'Type should be immediately after %s tag' % token.string,
-                        token)
+    def _CheckParamAndTypeFlag(self, token, state):
+        """Checks the parameter name and the type of a jsdoc flag.
 
-        elif token.type == Type.DOUBLE_QUOTE_STRING_START:
-            next_token = token.next
-            while next_token.type == Type.STRING_TEXT:
-                if javascripttokenizer.JavaScriptTokenizer.SINGLE_QUOTE.search(
-                    next_token.string):
-                    break
-                next_token = next_token.next
-            else:
+        Args:
+          token: The current token under consideration
+          state: parser_state object that indicates the current state in the page
+        """
+        flag = token.attached_object
+
+        if flag.flag_type == 'param' and flag.name_token is not None:
+            self._CheckForMissingSpaceBeforeToken(
+                token.attached_object.name_token)
+
+            if flag.type is not None and flag.name is not None:
+                if self.should_check(Rule.VARIABLE_ARG_MARKER):
+                    # Check for variable arguments marker in type.
+                    if flag.jstype.IsVarArgsType() and flag.name != 'var_args':
+                        self._HandleError(errors.JSDOC_MISSING_VAR_ARGS_NAME,
+                                          'Variable length argument %s must be renamed '
+                                          'to var_args.' % flag.name,
+                                          token)
+                    elif not flag.jstype.IsVarArgsType() and flag.name == 'var_args':
+                        self._HandleError(errors.JSDOC_MISSING_VAR_ARGS_TYPE,
+                                          'Variable length argument %s type must start '
+                                          'with \'...\'.' % flag.name,
+                                          token)
+
+                if self.should_check(Rule.OPTIONAL_TYPE_MARKER):
+                    # Check for optional marker in type.
+                    if (flag.jstype.opt_arg and
+                        not flag.name.startswith('opt_')):
+                        self._HandleError(errors.JSDOC_MISSING_OPTIONAL_PREFIX,
+                                          'Optional parameter name %s must be prefixed '
+                                          'with opt_.' % flag.name,
+                                          token)
+                    elif (not flag.jstype.opt_arg and
+                          flag.name.startswith('opt_')):
+                        self._HandleError(errors.JSDOC_MISSING_OPTIONAL_TYPE,
+                                          'Optional parameter %s type must end with =.' %
+                                          flag.name,
+                                          token)
+
+        if flag.flag_type in state.GetDocFlag().HAS_TYPE:
+            # Check for both missing type token and empty type braces '{}'
+            # Missing suppress types are reported separately and we allow enums,
+            # const, private, public and protected without types.
+            if (flag.flag_type not in state.GetDocFlag().CAN_OMIT_TYPE
+                and (not flag.jstype or flag.jstype.IsEmpty())):
+                self._HandleError(errors.MISSING_JSDOC_TAG_TYPE,
+                                  'Missing type in %s tag' % token.string, token)
+
+            elif flag.name_token and flag.type_end_token and tokenutil.Compare(
+                flag.type_end_token, flag.name_token) > 0:
                 self._HandleError(
-                    errors.UNNECESSARY_DOUBLE_QUOTED_STRING,
-                    'Single-quoted string preferred over double-quoted string.',
-                    token,
-                    position=Position.All(token.string))
+                    errors.OUT_OF_ORDER_JSDOC_TAG_TYPE,
+                    'Type should be immediately after %s tag' % token.string,
+                    token)
+
+    def _CheckDoubleQuotedString(self, token, state):
+        """Checks whether a double quoted string could be single quoted.
 
-        elif token.type == Type.END_DOC_COMMENT:
-            doc_comment = state.GetDocComment()
-
-            # When @externs appears in a @fileoverview comment, it should trigger
-            # the same limited doc checks as a special filename like externs.js.
-            if doc_comment.HasFlag('fileoverview') and doc_comment.HasFlag('externs'):
-                self._SetLimitedDocChecks(True)
-
-            if (self.should_check(Rule.BLANK_LINES_AT_TOP_LEVEL) and
-                not self._is_html and
-                state.InTopLevel() and
-                not state.InNonScopeBlock()):
-
-                # Check if we're in a fileoverview or constructor JsDoc.
-                is_constructor = (
-                    doc_comment.HasFlag('constructor') or
-                    doc_comment.HasFlag('interface'))
-                # @fileoverview is an optional tag so if the dosctring is the first
-                # token in the file treat it as a file level docstring.
-                is_file_level_comment = (
-                    doc_comment.HasFlag('fileoverview') or
-                    not doc_comment.start_token.previous)
-
-                # If the comment is not a file overview, and it does not immediately
-                # precede some code, skip it.
-                # NOTE: The tokenutil methods are not used here because of their
-                # behavior at the top of a file.
-                next_token = token.next
-                if (not next_token or
-                    (not is_file_level_comment and
-                     next_token.type in Type.NON_CODE_TYPES)):
-                    return
-
-                # Don't require extra blank lines around suppression of extra
-                # goog.require errors.
-                if (doc_comment.SuppressionOnly() and
-                    next_token.type == Type.IDENTIFIER and
-                    next_token.string in ['goog.provide', 'goog.require']):
-                    return
-
-                # Find the start of this block (include comments above the block, unless
-                # this is a file overview).
-                block_start = doc_comment.start_token
-                if not is_file_level_comment:
-                    token = block_start.previous
-                    while token and token.type in Type.COMMENT_TYPES:
-                        block_start = token
-                        token = token.previous
-
-                # Count the number of blank lines before this block.
-                blank_lines = 0
+        Args:
+          token: The current token under consideration
+          state: parser_state object that indicates the current state in the page
+        """
+        next_token = token.next
+        while next_token.type == Type.STRING_TEXT:
+            if javascripttokenizer.JavaScriptTokenizer.SINGLE_QUOTE.search(
+                next_token.string):
+                break
+            next_token = next_token.next
+        else:
+            self._HandleError(
+                errors.UNNECESSARY_DOUBLE_QUOTED_STRING,
+                'Single-quoted string preferred over double-quoted string.',
+                token,
+                position=Position.All(token.string))
+
+    def _CheckEndDocComment(self, token, state):
+        """Checks the blank lines around a top level doc comment.
+
+        Args:
+          token: The current token under consideration
+          state: parser_state object that indicates the current state in the page
+        """
+        doc_comment = state.GetDocComment()
+
+        # When @externs appears in a @fileoverview comment, it should trigger
+        # the same limited doc checks as a special filename like externs.js.
+        if doc_comment.HasFlag('fileoverview') and doc_comment.HasFlag('externs'):
+            self._SetLimitedDocChecks(True)
+
+        if (self.should_check(Rule.BLANK_LINES_AT_TOP_LEVEL) and
+            not self._is_html and
+            state.InTopLevel() and
+            not state.InNonScopeBlock()):
+
+            # Check if we're in a fileoverview or constructor JsDoc.
+            is_constructor = (
+                doc_comment.HasFlag('constructor') or
+                doc_comment.HasFlag('interface'))
+            # @fileoverview is an optional tag so if the dosctring is the first
+            # token in the file treat it as a file level docstring.
+            is_file_level_comment = (
+                doc_comment.HasFlag('fileoverview') or
+                not doc_comment.start_token.previous)
+
+            # If the comment is not a file overview, and it does not immediately
+            # precede some code, skip it.
+            # NOTE: The tokenutil methods are not used here because of their
+            # behavior at the top of a file.
+            next_token = token.next
+            if (not next_token or
+                (not is_file_level_comment and
+                 next_token.type in Type.NON_CODE_TYPES)):
+                return
+
+            # Don't require extra blank lines around suppression of extra
+            # goog.require errors.
+            if (doc_comment.SuppressionOnly() and
+                next_token.type == Type.IDENTIFIER and
+                next_token.string in ['goog.provide', 'goog.require']):
+                return
+
+            # Find the start of this block (include comments above the block, unless
+            # this is a file overview).
+            block_start = doc_comment.start_token
+            if not is_file_level_comment:
                 token = block_start.previous
-                while token and token.type in [Type.WHITESPACE, Type.BLANK_LINE]:
-                    if token.type == Type.BLANK_LINE:
-                        # A blank line.
-                        blank_lines += 1
-                    elif token.type == Type.WHITESPACE and not token.line.strip():
-                        # A line with only whitespace on it.
-                        blank_lines += 1
+                while token and token.type in Type.COMMENT_TYPES:
+                    block_start = token
                     token = token.previous
 
-                # Log errors.
-                error_message = False
-                expected_blank_lines = 0
-
-                # Only need blank line before file overview if it is not the beginning
-                # of the file, e.g. copyright is first.
-                if is_file_level_comment and blank_lines == 0 and block_start.previous:
-                    error_message = 'Should have a blank line before a file overview.'
-                    expected_blank_lines = 1
-                elif is_constructor and blank_lines != 3:
-                    error_message = (
-                        'Should have 3 blank lines before a constructor/interface.')
-                    expected_blank_lines = 3
-                elif (not is_file_level_comment and not is_constructor and
-                      blank_lines != 2):
-                    error_message = 'Should have 2 blank lines between top-level blocks.'
-                    expected_blank_lines = 2
-
-                if error_message:
-                    self._HandleError(
-                        errors.WRONG_BLANK_LINE_COUNT, error_message,
-                        block_start, position=Position.AtBeginning(),
-                        fix_data=expected_blank_lines - blank_lines)
+            # Count the number of blank lines before this block.
+            blank_lines = 0
+            token = block_start.previous
+            while token and token.type in [Type.WHITESPACE, Type.BLANK_LINE]:
+                if token.type == Type.BLANK_LINE:
+                    # A blank line.
+                    blank_lines += 1
+                elif token.type == Type.WHITESPACE and not token.line.strip():
+                    # A line with only whitespace on it.
+                    blank_lines += 1
+                token = token.previous
+
+            # Log errors.
+            error_message = False
+            expected_blank_lines = 0
+
+            # Only need blank line before file overview if it is not the beginning
+            # of the file, e.g. copyright is first.
+            if is_file_level_comment and blank_lines == 0 and block_start.previous:
+                error_message = 'Should have a blank line before a file overview.'
+                expected_blank_lines = 1
+            elif is_constructor and blank_lines != 3:
+                error_message = (
+                    'Should have 3 blank lines before a constructor/interface.')
+                expected_blank_lines = 3
+            elif (not is_file_level_comment and not is_constructor and
+                  blank_lines != 2):
+                error_message = 'Should have 2 blank lines between top-level blocks.'
+                expected_blank_lines = 2
+
+            if error_message:
+                self._HandleError(
+                    errors.WRONG_BLANK_LINE_COUNT, error_message,
+                    block_start, position=Position.AtBeginning(),
+                    fix_data=expected_blank_lines - blank_lines)
 
-        elif token.type == Type.END_BLOCK:
-            if state.InFunction() and state.IsFunctionClose():
-                is_immediately_called = (token.next and
-                                         token.next.type == Type.START_PAREN)
-
-                function = state.GetFunction()
-                if not self._limited_doc_checks:
-                    if (function.has_return and function.doc and
-                        not is_immediately_called and
-                        not function.doc.HasFlag('return') and
-                        not function.doc.InheritsDocumentation() and
-                        not function.doc.HasFlag('constructor')):
-                        # Check for proper documentation of return value.
-                        self._HandleError(
-                            errors.MISSING_RETURN_DOCUMENTATION,
-                            'Missing @return JsDoc in function with non-trivial return',
-                            function.doc.end_token, position=Position.AtBeginning())
-                    elif (not function.has_return and
-                          not function.has_throw and
-                          function.doc and
-                          function.doc.HasFlag('return') and
-                          not state.InInterfaceMethod()):
-                        flag = function.doc.GetFlag('return')
-                        valid_no_return_names = ['undefined', 'void', '*']
-                        invalid_return = flag.jstype is None or not any(
-                            sub_type.identifier in valid_no_return_names
-                            for sub_type in flag.jstype.IterTypeGroup())
-
-                        if invalid_return:
-                            self._HandleError(
-                                errors.UNNECESSARY_RETURN_DOCUMENTATION,
-                                'Found @return JsDoc on function that returns nothing',
-                                flag.flag_token, position=Position.AtBeginning())
-
-                # b/4073735. Method in object literal definition of prototype can
-                # safely reference 'this'.
-                prototype_object_literal = False
-                block_start = None
-                previous_code = None
-                previous_previous_code = None
-
-                # Search for cases where prototype is defined as object literal.
-                #       previous_previous_code
-                #       |       previous_code
-                #       |       | block_start
-                #       |       | |
-                # a.b.prototype = {
-                #   c : function() {
-                #     this.d = 1;
-                #   }
-                # }
-
-                # If in object literal, find first token of block so to find previous
-                # tokens to check above condition.
-                if state.InObjectLiteral():
-                    block_start = state.GetCurrentBlockStart()
-
-                # If an object literal then get previous token (code type). For above
-                # case it should be '='.
-                if block_start:
-                    previous_code = tokenutil.SearchExcept(block_start,
-                                                           Type.NON_CODE_TYPES,
-                                                           reverse=True)
-
-                # If previous token to block is '=' then get its previous token.
-                if previous_code and previous_code.IsOperator('='):
-                    previous_previous_code = tokenutil.SearchExcept(previous_code,
-                                                                    Type.NON_CODE_TYPES,
-                                                                    reverse=True)
-
-                # If variable/token before '=' ends with '.prototype' then its above
-                # case of prototype defined with object literal.
-                prototype_object_literal = (previous_previous_code and
-                                            previous_previous_code.string.endswith(
-                                                '.prototype'))
-
-                if (function.has_this and function.doc and
-                    not function.doc.HasFlag('this') and
-                    not function.is_constructor and
-                    not function.is_interface and
-                    '.prototype.' not in function.name and
-                    not prototype_object_literal):
-                    self._HandleError(
-                        errors.MISSING_JSDOC_TAG_THIS,
-                        'Missing @this JsDoc in function referencing "this". ('
-                        'this usually means you are trying to reference "this" in '
-                        'a static function, or you have forgotten to mark a '
-                        'constructor with @constructor)',
-                        function.doc.end_token, position=Position.AtBeginning())
+    def _CheckFunctionClose(self, token, state):
+        """Checks the @return and @this docs of a function being closed.
 
-        elif token.type == Type.IDENTIFIER:
-            if token.string == 'goog.inherits' and not state.InFunction():
-                if state.GetLastNonSpaceToken().line_number == token.line_number:
+        Args:
+          token: The current token under consideration
+          state: parser_state object that indicates the current state in the page
+        """
+        if state.InFunction() and state.IsFunctionClose():
+            is_immediately_called = (token.next and
+                                     token.next.type == Type.START_PAREN)
+
+            function = state.GetFunction()
+            if not self._limited_doc_checks:
+                if (function.has_return and function.doc and
+                    not is_immediately_called and
+                    not function.doc.HasFlag('return') and
+                    not function.doc.InheritsDocumentation() and
+                    not function.doc.HasFlag('constructor')):
+                    # Check for proper documentation of return value.
                     self._HandleError(
-                        errors.MISSING_LINE,
-                        'Missing newline between constructor and goog.inherits',
-                        token,
-                        position=Position.AtBeginning())
-
-                extra_space = state.GetLastNonSpaceToken().next
-                while extra_space != token:
-                    if extra_space.type == Type.BLANK_LINE:
+                        errors.MISSING_RETURN_DOCUMENTATION,
+                        'Missing @return JsDoc in function with non-trivial return',
+                        function.doc.end_token, position=Position.AtBeginning())
+                elif (not function.has_return and
+                      not function.has_throw and
+                      function.doc and
+                      function.doc.HasFlag('return') and
+                      not state.InInterfaceMethod()):
+                    flag = function.doc.GetFlag('return')
+                    valid_no_return_names = ['undefined', 'void', '*']
+                    invalid_return = flag.jstype is None or not any(
+                        sub_type.identifier in valid_no_return_names
+                        for sub_type in flag.jstype.IterTypeGroup())
+
+                    if invalid_return:
                         self._HandleError(
-                            errors.EXTRA_LINE,
-                            'Extra line between constructor and goog.inherits',
-                            extra_space)
-                    extra_space = extra_space.next
-
-                # TODO(robbyw): Test the last function was a constructor.
-                # TODO(robbyw): Test correct @extends and @implements documentation.
-
-            elif (token.string == 'goog.provide' and
-                  not state.InFunction() and
-                  namespaces_info is not None):
-                namespace = tokenutil.GetStringAfterToken(token)
-
-                # Report extra goog.provide statement.
-                if not namespace or namespaces_info.IsExtraProvide(token):
-                    if not namespace:
-                        msg = 'Empty namespace in goog.provide'
-                    else:
-                        msg = 'Unnecessary goog.provide: ' +  namespace
-
-                        # Hint to user if this is a Test namespace.
-                        if namespace.endswith('Test'):
-                            msg += (' *Test namespaces must be mentioned in the '
-                                    'goog.setTestOnly() call')
+                            errors.UNNECESSARY_RETURN_DOCUMENTATION,
+                            'Found @return JsDoc on function that returns nothing',
+                            flag.flag_token, position=Position.AtBeginning())
+
+            # b/4073735. Method in object literal definition of prototype can
+            # safely reference 'this'.
+            prototype_object_literal = False
+            block_start = None
+            previous_code = None
+            previous_previous_code = None
+
+            # Search for cases where prototype is defined as object literal.
+            #       previous_previous_code
+            #       |       previous_code
+            #       |       | block_start
+            #       |       | |
+            # a.b.prototype = {
+            #   c : function() {
+            #     this.d = 1;
+            #   }
+            # }
+
+            # If in object literal, find first token of block so to find previous
+            # tokens to check above condition.
+            if state.InObjectLiteral():
+                block_start = state.GetCurrentBlockStart()
+
+            # If an object literal then get previous token (code type). For above
+            # case it should be '='.
+            if block_start:
+                previous_code = tokenutil.SearchExcept(block_start,
+                                                       Type.NON_CODE_TYPES,
+                                                       reverse=True)
+
+            # If previous token to block is '=' then get its previous token.
+            if previous_code and previous_code.IsOperator('='):
+                previous_previous_code = tokenutil.SearchExcept(previous_code,
+                                                                Type.NON_CODE_TYPES,
+                                                                reverse=True)
+
+            # If variable/token before '=' ends with '.prototype' then its above
+            # case of prototype defined with object literal.
+            prototype_object_literal = (previous_previous_code and
+                                        previous_previous_code.string.endswith(
+                                            '.prototype'))
+
+            if (function.has_this and function.doc and
+                not function.doc.HasFlag('this') and
+                not function.is_constructor and
+                not function.is_interface and
+                '.prototype.' not in function.name and
+                not prototype_object_literal):
+                self._HandleError(
+                    errors.MISSING_JSDOC_TAG_THIS,
+                    'Missing @this JsDoc in function referencing "this". ('
+                    'this usually means you are trying to reference "this" in '
+                    'a static function, or you have forgotten to mark a '
+                    'constructor with @constructor)',
+                    function.doc.end_token, position=Position.AtBeginning())
 
-                    self._HandleError(
-                        errors.EXTRA_GOOG_PROVIDE,
-                        msg,
-                        token, position=Position.AtBeginning())
-
-                if namespaces_info.IsLastProvide(token):
-                    # Report missing provide statements after the last existing provide.
-                    missing_provides = namespaces_info.GetMissingProvides()
-                    if missing_provides:
-                        self._ReportMissingProvides(
-                            missing_provides,
-                            tokenutil.GetLastTokenInSameLine(token).next,
-                            False)
-
-                    # If there are no require statements, missing requires should be
-                    # reported after the last provide.
-                    if not namespaces_info.GetRequiredNamespaces():
-                        missing_requires, illegal_alias_statements = (
-                            namespaces_info.GetMissingRequires())
-                        if missing_requires:
-                            self._ReportMissingRequires(
-                                missing_requires,
-                                tokenutil.GetLastTokenInSameLine(token).next,
-                                True)
-                        if illegal_alias_statements:
-                            self._ReportIllegalAliasStatement(illegal_alias_statements)
-
-            elif (token.string == 'goog.require' and
-                  not state.InFunction() and
-                  namespaces_info is not None):
-                namespace = tokenutil.GetStringAfterToken(token)
-
-                # If there are no provide statements, missing provides should be
-                # reported before the first require.
-                if (namespaces_info.IsFirstRequire(token) and
-                    not namespaces_info.GetProvidedNamespaces()):
-                    missing_provides = namespaces_info.GetMissingProvides()
-                    if missing_provides:
-                        self._ReportMissingProvides(
-                            missing_provides,
-                            tokenutil.GetFirstTokenInSameLine(token),
-                            True)
+    def _CheckClosureIdentifier(self, token, state):
+        """Checks goog.inherits, goog.provide and goog.require statements.
 
-                # Report extra goog.require statement.
-                if not namespace or namespaces_info.IsExtraRequire(token):
-                    if not namespace:
-                        msg = 'Empty namespace in goog.require'
-                    else:
-                        msg = 'Unnecessary goog.require: ' + namespace
+        Args:
+          token: The current token under consideration
+          state: parser_state object that indicates the current state in the page
+        """
+        namespaces_info = self._namespaces_info
 
+        if token.string == 'goog.inherits' and not state.InFunction():
+            if state.GetLastNonSpaceToken().line_number == token.line_number:
+                self._HandleError(
+                    errors.MISSING_LINE,
+                    'Missing newline between constructor and goog.inherits',
+                    token,
+                    position=Position.AtBeginning())
+
+            extra_space = state.GetLastNonSpaceToken().next
+            while extra_space != token:
+                if extra_space.type == Type.BLANK_LINE:
                     self._HandleError(
-                        errors.EXTRA_GOOG_REQUIRE,
-                        msg,
-                        token, position=Position.AtBeginning())
+                        errors.EXTRA_LINE,
+                        'Extra line between constructor and goog.inherits',
+                        extra_space)
+                extra_space = extra_space.next
+
+            # TODO(robbyw): Test the last function was a constructor.
+            # TODO(robbyw): Test correct @extends and @implements documentation.
+
+        elif (token.string == 'goog.provide' and
+              not state.InFunction() and
+              namespaces_info is not None):
+            namespace = tokenutil.GetStringAfterToken(token)
+
+            # Report extra goog.provide statement.
+            if not namespace or namespaces_info.IsExtraProvide(token):
+                if not namespace:
+                    msg = 'Empty namespace in goog.provide'
+                else:
+                    msg = 'Unnecessary goog.provide: ' +  namespace
+
+                    # Hint to user if this is a Test namespace.
+                    if namespace.endswith('Test'):
+                        msg += (' *Test namespaces must be mentioned in the '
+                                'goog.setTestOnly() call')
 
-                # Report missing goog.require statements.
-                if namespaces_info.IsLastRequire(token):
+                self._HandleError(
+                    errors.EXTRA_GOOG_PROVIDE,
+                    msg,
+                    token, position=Position.AtBeginning())
+
+            if namespaces_info.IsLastProvide(token):
+                # Report missing provide statements after the last existing provide.
+                missing_provides = namespaces_info.GetMissingProvides()
+                if missing_provides:
+                    self._ReportMissingProvides(
+                        missing_provides,
+                        tokenutil.GetLastTokenInSameLine(token).next,
+                        False)
+
+                # If there are no require statements, missing requires should be
+                # reported after the last provide.
+                if not namespaces_info.GetRequiredNamespaces():
                     missing_requires, illegal_alias_statements = (
                         namespaces_info.GetMissingRequires())
                     if missing_requires:
                         self._ReportMissingRequires(
                             missing_requires,
                             tokenutil.GetLastTokenInSameLine(token).next,
-                            False)
+                            True)
                     if illegal_alias_statements:
                         self._ReportIllegalAliasStatement(illegal_alias_statements)
 
-        elif token.type == Type.OPERATOR:
-            last_in_line = token.IsLastInLine()
-            # If the token is unary and appears to be used in a unary context
-            # it's ok.  Otherwise, if it's at the end of the line or immediately
-            # before a comment, it's ok.
-            # Don't report an error before a start bracket - it will be reported
-            # by that token's space checks.
-            if (not token.metadata.IsUnaryOperator() and not last_in_line
-                and not token.next.IsComment()
-                and not token.next.IsOperator(',')
-                and not tokenutil.IsDot(token)
-                and token.next.type not in (Type.WHITESPACE, Type.END_PAREN,
-                                            Type.END_BRACKET, Type.SEMICOLON,
-                                            Type.START_BRACKET)):
-                self._HandleError(
-                    errors.MISSING_SPACE,
-                    'Missing space after "%s"' % token.string,
-                    token,
-                    position=Position.AtEnd(token.string))
-        elif token.type == Type.WHITESPACE:
-            first_in_line = token.IsFirstInLine()
-            last_in_line = token.IsLastInLine()
-            # Check whitespace length if it's not the first token of the line and
-            # if it's not immediately before a comment.
-            if not last_in_line and not first_in_line and not token.next.IsComment():
-                # Ensure there is no space after opening parentheses.
-                if (token.previous.type in (Type.START_PAREN, Type.START_BRACKET,
-                                            Type.FUNCTION_NAME)
-                    or token.next.type == Type.START_PARAMETERS):
-                    self._HandleError(
-                        errors.EXTRA_SPACE,
-                        'Extra space after "%s"' % token.previous.string,
-                        token,
-                        position=Position.All(token.string))
-        elif token.type == Type.SEMICOLON:
-            previous_token = tokenutil.SearchExcept(token, Type.NON_CODE_TYPES,
-                                                    reverse=True)
-            if not previous_token:
+        elif (token.string == 'goog.require' and
+              not state.InFunction() and
+              namespaces_info is not None):
+            namespace = tokenutil.GetStringAfterToken(token)
+
+            # If there are no provide statements, missing provides should be
+            # reported before the first require.
+            if (namespaces_info.IsFirstRequire(token) and
+                not namespaces_info.GetProvidedNamespaces()):
+                missing_provides = namespaces_info.GetMissingProvides()
+                if missing_provides:
+                    self._ReportMissingProvides(
+                        missing_provides,
+                        tokenutil.GetFirstTokenInSameLine(token),
+                        True)
+
+            # Report extra goog.require statement.
+            if not namespace or namespaces_info.IsExtraRequire(token):
+                if not namespace:
+                    msg = 'Empty namespace in goog.require'
+                else:
+                    msg = 'Unnecessary goog.require: ' + namespace
+
                 self._HandleError(
-                    errors.REDUNDANT_SEMICOLON,
-                    'Semicolon without any statement',
-                    token,
-                    position=Position.AtEnd(token.string))
-            elif (previous_token.type == Type.KEYWORD and
-                  previous_token.string not in ['break', 'continue', 'return']):
+                    errors.EXTRA_GOOG_REQUIRE,
+                    msg,
+                    token, position=Position.AtBeginning())
+
+            # Report missing goog.require statements.
+            if namespaces_info.IsLastRequire(token):
+                missing_requires, illegal_alias_statements = (
+                    namespaces_info.GetMissingRequires())
+                if missing_requires:
+                    self._ReportMissingRequires(
+                        missing_requires,
+                        tokenutil.GetLastTokenInSameLine(token).next,
+                        False)
+                if illegal_alias_statements:
+                    self._ReportIllegalAliasStatement(illegal_alias_statements)
+
+    def _CheckSpaceAfterOperator(self, token, state):
+        """Checks for a missing space after an operator.
+
+        Args:
+          token: The current token under consideration
+          state: parser_state object that indicates the current state in the page
+        """
+        last_in_line = token.IsLastInLine()
+        # If the token is unary and appears to be used in a unary context
+        # it's ok.  Otherwise, if it's at the end of the line or immediately
+        # before a comment, it's ok.
+        # Don't report an error before a start bracket - it will be reported
+        # by that token's space checks.
+        if (not token.metadata.IsUnaryOperator() and not last_in_line
+            and not token.next.IsComment()
+            and not token.next.IsOperator(',')
+            and not tokenutil.IsDot(token)
+            and token.next.type not in (Type.WHITESPACE, Type.END_PAREN,
+                                        Type.END_BRACKET, Type.SEMICOLON,
+                                        Type.START_BRACKET)):
+            self._HandleError(
+                errors.MISSING_SPACE,
+                'Missing space after "%s"' % token.string,
+                token,
+                position=Position.AtEnd(token.string))
+
+    def _CheckSpaceAfterOpening(self, token, state):
+        """Checks for extra space after an opening paren or bracket.
+
+        Args:
+          token: The current token under consideration
+          state: parser_state object that indicates the current state in the page
+        """
+        first_in_line = token.IsFirstInLine()
+        last_in_line = token.IsLastInLine()
+        # Check whitespace length if it's not the first token of the line and
+        # if it's not immediately before a comment.
+        if not last_in_line and not first_in_line and not token.next.IsComment():
+            # Ensure there is no space after opening parentheses.
+            if (token.previous.type in (Type.START_PAREN, Type.START_BRACKET,
+                                        Type.FUNCTION_NAME)
+                or token.next.type == Type.START_PARAMETERS):
                 self._HandleError(
-                    errors.REDUNDANT_SEMICOLON,
-                    ('Semicolon after \'%s\' without any statement.'
-                     ' Looks like an error.' % previous_token.string),
+                    errors.EXTRA_SPACE,
+                    'Extra space after "%s"' % token.previous.string,
                     token,
-                    position=Position.AtEnd(token.string))
+                    position=Position.All(token.string))
+
+    def _CheckEmptyStatement(self, token, state):
+        """Checks for semicolons without a statement.
+
+        Args:
+          token: The current token under consideration
+          state: parser_state object that indicates the current state in the page
+        """
+        previous_token = tokenutil.SearchExcept(token, Type.NON_CODE_TYPES,
+                                                reverse=True)
+        if not previous_token:
+            self._HandleError(
+                errors.REDUNDANT_SEMICOLON,
+                'Semicolon without any statement',
+                token,
+                position=Position.AtEnd(token.string))
+        elif (previous_token.type == Type.KEYWORD and
+              previous_token.string not in ['break', 'continue', 'return']):
+            self._HandleError(
+                errors.REDUNDANT_SEMICOLON,
+                ('Semicolon after \'%s\' without any statement.'
+                 ' Looks like an error.' % previous_token.string),
+                token,
+                position=Position.AtEnd(token.string))
 
     def _CheckUnusedLocalVariables(self, token, state):
         """Checks for unused local variables in function blocks.
@@ -694,7 +773,7 @@ class JavaScriptLintRules(ecmalintrules.EcmaScriptLintRules):
         # Call the base class's Finalize function.
         super(JavaScriptLintRules, self).Finalize(state)
 
-        if self.should_check(Rule.UNUSED_PRIVATE_MEMBERS):
+        if self._check_unused_private_members:
             # Report an error for any declared private member that was never used.
             unused_private_members = (self._declared_private_members -
                                       self._used_private_members)
@@ -43,15 +43,38 @@ import glob
 import re
 import multiprocessing
 import errno
-from itertools import tee
+import threading
+from multiprocessing.pool import ThreadPool
 from functools import partial
 
-from jscodestyle.errorrecord import check_path, fix_path
+from jscodestyle.errorrecord import (cached_check_path, check_path,
+                                     check_path_iter, fix_path)
 from jscodestyle.error_check import STRICT_DOC, JSLINT_ERROR_DOC
 from jscodestyle.error_fixer import ErrorFixer
 
 GJSLINT_ONLY_FLAGS = ['--unix_mode', '--beep', '--nobeep', '--time',
-                      '--check_html', '--summary', '--quiet']
+                      '--check_html', '--summary', '--quiet', '--cache_dir']
+
+# The flags above that take a value, which may be given as a separate argument.
+GJSLINT_ONLY_VALUE_FLAGS = ['--cache_dir']
+
+# How many files a worker process checks before it is replaced by a fresh one.
+_MAX_FILES_PER_WORKER = 200
+
+# The check function of a worker process, set once when the worker starts so
+# that it is not sent along with every batch of paths.
+_worker_check_fn = None
+
+
+def _init_worker(check_fn):
+    """Stores the check function for a new worker process."""
+    global _worker_check_fn
+    _worker_check_fn = check_fn
+
+
+def _worker_check_path(path):
+    """Checks a path with the check function of this worker process."""
+    return _worker_check_fn(path)
 
 # Comment - Below are all the arguments from gjslint. There are way
 # too many, we should think what is really useful and cull some.
@@ -109,6 +132,12 @@ class JsCodeStyle(object):
                   'multiprocessing module; this may make debugging easier.'),
             action='store_true')
 
+        parser.add_argument(
+            '--cache_dir',
+            help=('directory in which to keep the results of each check, so '
+                  'that unchanged files are not checked again on later runs.'),
+            metavar='dir')
+
         parser.add_argument(
             '-a', '--additional_extensions',
             help=('Additional file extensions (not js) that should '
@@ -261,11 +290,13 @@ class JsCodeStyle(object):
         if 'INSIDE_EMACS' in os.environ:
             self.args.unix_mode = True
 
-        self.suffixes = ['.js']
+        suffixes = ['.js']
         if self.args.additional_extensions:
-            self.suffixes += ['.%s' % ext for ext in self.args.additional_extensions]
+            suffixes += ['.%s' % ext for ext in self.args.additional_extensions]
         if self.args.check_html:
-            self.suffixes += ['.html', '.htm']
+            suffixes += ['.html', '.htm']
+        # A tuple so that a single str.endswith call can test every suffix.
+        self.suffixes = tuple(suffixes)
         self.paths = None
         self._get_paths()
         self.start_time = time.time()
@@ -279,8 +310,7 @@ class JsCodeStyle(object):
         Returns:
           Whether the given filename matches one of the given suffixes.
         """
-        suffix = filename[filename.rfind('.'):]
-        return suffix in self.suffixes
+        return filename.endswith(self.suffixes)
 
     def get_user_specified_files(self):
         """Returns files to be linted, specified directly on the command line.
@@ -295,19 +325,19 @@ class JsCodeStyle(object):
         Returns:
           A sequence of files to be linted.
         """
-        all_files = []
+        suffixes = self.suffixes
         lint_files = []
 
-         # Perform any necessary globs.
         for filename in self.args.paths:
-            if filename.find('*') != -1:
-                for result in glob.glob(filename):
-                    all_files.append(result)
-            else:
-                all_files.append(filename)
-
-        for filename in all_files:
-            if self.matches_suffixes(filename):
+            # Perform any necessary globs.
+            if filename.endswith('*'):
+                # Let the pattern itself match only the wanted suffixes.
+                for suffix in suffixes:
+                    lint_files.extend(glob.iglob(filename + suffix))
+            elif '*' in filename:
+                lint_files.extend(result for result in glob.iglob(filename)
+                                  if result.endswith(suffixes))
+            elif filename.endswith(suffixes):
                 lint_files.append(filename)
         return lint_files
 
@@ -320,11 +350,31 @@ class JsCodeStyle(object):
         lint_files = []
         # Perform any request recursion
         if self.args.recurse:
-            for start in self.args.recurse:
-                for root, _, files in os.walk(start):
-                    for filename in files:
-                        if self.matches_suffixes(filename):
-                            lint_files.append(os.path.join(root, filename))
+            starts = [start for group in self.args.recurse for start in group]
+            walk_root = partial(self._walk_root, suffixes=self.suffixes)
+            if len(starts) > 1:
+                # Directory listing releases the GIL, so separate roots can be
+                # walked in parallel threads.
+                pool = ThreadPool(min(8, len(starts)))
+                try:
+                    root_files = pool.map(walk_root, starts)
+                finally:
+                    pool.close()
+                    pool.join()
+            else:
+                root_files = [walk_root(start) for start in starts]
+            for files in root_files:
+                lint_files.extend(files)
+        return lint_files
+
+    @staticmethod
+    def _walk_root(start, suffixes):
+        """Returns the files under start whose names end with one of suffixes."""
+        lint_files = []
+        for root, _, files in os.walk(start):
+            for filename in files:
+                if filename.endswith(suffixes):
+                    lint_files.append(os.path.join(root, filename))
         return lint_files
 
     def filter_files(self, files):
@@ -340,39 +390,46 @@ class JsCodeStyle(object):
         """
         num_files = len(files)
 
-        ignore_dirs_regexs = []
-
-        excluded_dirs = (self.args.exclude_directories if
-                         self.args.exclude_directories else [])
-
-        excluded_files = (self.args.exclude_files if
-                          self.args.exclude_files else [])
-
-        for ignore in excluded_dirs:
-            ignore_dirs_regexs.append(re.compile(r'(^|[\\/])%s[\\/]' % ignore))
-
-        result_files = []
+        # Each use of these flags appends its own list of names.
+        excluded_dirs = [directory
+                         for directories in self.args.exclude_directories or []
+                         for directory in directories]
+
+        excluded_files = [exclude
+                          for excludes in self.args.exclude_files or []
+                          for exclude in excludes]
+
+        # Build the exclusion tests once rather than once per file.
+        ignore_dirs_regex = None
+        if excluded_dirs:
+            ignore_dirs_regex = re.compile(r'(^|[\\/])(?:%s)[\\/]' % '|'.join(
+                re.escape(directory) for directory in excluded_dirs))
+
+        excluded_names = frozenset(excluded_files)
+        excluded_suffixes = tuple('/' + exclude for exclude in excluded_files)
+
+        # os.path.abspath looks up the working directory for every relative
+        # path, so look it up once here instead.
+        cwd = os.getcwd()
+        num_kept = 0
+        result_files = set()
         for filename in files:
-            add_file = True
-            for exclude in excluded_files:
-                if filename.endswith('/' + exclude) or filename == exclude:
-                    add_file = False
-                    break
-            for ignore in ignore_dirs_regexs:
-                if ignore.search(filename):
-                    # Break out of ignore loop so we don't add to
-                    # filtered files.
-                    break
-            if add_file:
-                # Convert everything to absolute paths so we can easily remove duplicates
-                # using a set.
-                result_files.append(os.path.abspath(filename))
-
-        skipped = num_files - len(result_files)
+            if (filename in excluded_names or
+                    filename.endswith(excluded_suffixes) or
+                    (ignore_dirs_regex and ignore_dirs_regex.search(filename))):
+                continue
+            num_kept += 1
+            # Convert everything to absolute paths so we can easily remove duplicates
+            # using a set.
+            if not os.path.isabs(filename):
+                filename = os.path.join(cwd, filename)
+            result_files.add(os.path.normpath(filename))
+
+        skipped = num_files - num_kept
         if skipped:
             print('Skipping %d file(s).' % skipped)
 
-        self.paths = set(result_files)
+        self.paths = result_files
 
 
     def _get_paths(self):
@@ -399,12 +456,46 @@ class JsCodeStyle(object):
           errorrecord.ErrorRecords for any found errors.
         """
 
-        pool = multiprocessing.Pool()
-
-        path_results = pool.imap(check_fn, self.paths)
-        for results in path_results:
-            for result in results:
-                yield result
+        # Replace each worker after a number of files so that memory held on
+        # to by the checkers can't grow without bound over long runs.
+        pool = multiprocessing.Pool(initializer=_init_worker,
+                                    initargs=(check_fn,),
+                                    maxtasksperchild=_MAX_FILES_PER_WORKER)
+
+        # Hand out the largest files first, one at a time, so that a big file
+        # is never queued behind others on a busy worker. Results are taken in
+        # whichever order the workers finish them.
+        paths = sorted(self.paths, key=self._get_file_size, reverse=True)
+
+        # Only let a few files per worker be queued or waiting to be printed,
+        # so that results can't pile up in memory when printing falls behind.
+        pending = threading.Semaphore(multiprocessing.cpu_count() * 2)
+        stopped = threading.Event()
+
+        def _throttled_paths():
+            for path in paths:
+                pending.acquire()
+                if stopped.is_set():
+                    return
+                yield path
+
+        path_results = pool.imap_unordered(_worker_check_path,
+                                           _throttled_paths())
+        completed = False
+        try:
+            for results in path_results:
+                pending.release()
+                for result in results:
+                    yield result
+            completed = True
+        finally:
+            if not completed:
+                # A worker raised, or the caller stopped early.  Wake the pool's
+                # task feeder so it can finish, then stop the workers, or the
+                # pool's cleanup at exit waits on the feeder forever.
+                stopped.set()
+                pending.release()
+                pool.terminate()
 
         # Force destruct before returning, as this can sometimes raise spurious
         # "interrupted system call" (EINTR), which we can ignore.
@@ -416,6 +507,14 @@ class JsCodeStyle(object):
             if err.errno is not errno.EINTR:
                 raise err
 
+    @staticmethod
+    def _get_file_size(path):
+        """Returns the size of the file at path, or 0 if it can't be read."""
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
     def _check_paths(self, check_fn):
         """Run _check_path on all paths in one thread.
 
@@ -431,15 +530,12 @@ class JsCodeStyle(object):
             for record in results:
                 yield record
 
-    def _print_file_summary(self, records):
+    def _print_file_summary(self, error_counts):
         """Print a detailed summary of the number of errors in each file."""
 
-        paths = list(self.paths)
-        paths.sort()
-
-        for path in paths:
-            path_errors = [e for e in records if e.path == path]
-            print('%s: %d' % (path, len(path_errors)))
+        sys.stdout.write(''.join(
+            '%s: %d\n' % (path, error_counts.get(path, 0))
+            for path in sorted(self.paths)))
 
 
     @staticmethod
@@ -447,8 +543,25 @@ class JsCodeStyle(object):
         print('----- FILE  :  %s -----' % path)
 
     def _print_error_records(self, error_records):
-        """Print error records strings in the expected format."""
+        """Print error records strings in the expected format.
 
+        The records are counted as they are printed rather than kept, so any
+        number of them can be reported in constant memory per file.
+
+        Args:
+          error_records: An iterable of errorrecord.ErrorRecords, printed as
+              they are produced.
+
+        Returns:
+          A tuple of a dict mapping each path with errors to its number of
+          errors, and the total number of new errors.
+        """
+
+        # One write per line; sys.stdout already buffers them into larger
+        # writes when it is not a terminal.
+        write = sys.stdout.write
+        error_counts = {}
+        new_error_count = 0
         current_path = None
         for record in error_records:
 
@@ -457,22 +570,23 @@ class JsCodeStyle(object):
                 if not self.args.unix_mode:
                     self._print_file_separator(current_path)
 
-            print(record.error_string)
+            write(record.error_string + '\n')
+            error_counts[current_path] = error_counts.get(current_path, 0) + 1
+            if record.new_error:
+                new_error_count += 1
+
+        return error_counts, new_error_count
 
-    def _print_summary(self, paths, error_records):
+    def _print_summary(self, paths, error_counts, new_error_count):
         """Print a summary of the number of errors and files."""
 
-        error_count = len(error_records)
-        all_paths = set(paths)
-        all_paths_count = len(all_paths)
+        error_count = sum(error_counts.values())
+        all_paths_count = len(paths)
 
-        if error_count is 0:
+        if error_count == 0:
             print ('%d files checked, no errors found.' % all_paths_count)
 
-        new_error_count = len([e for e in error_records if e.new_error])
-
-        error_paths = set([e.path for e in error_records])
-        error_paths_count = len(error_paths)
+        error_paths_count = len(error_counts)
         no_error_paths_count = all_paths_count - error_paths_count
 
         if (error_count or new_error_count) and not self.args.quiet:
@@ -508,8 +622,14 @@ class JsCodeStyle(object):
 
     def check(self):
         """Check the JavaScript files for style."""
+        # Starting a pool costs more than it saves for a single file or CPU.
+        single_process = (self.args.singleprocess or len(self.paths) <= 1 or
+                          multiprocessing.cpu_count() == 1)
+
+        # Worker processes must pickle their results back as a list, but a
+        # single process can handle records as they are made.
         check_path_p = partial(
-            check_path,
+            check_path_iter if single_process else check_path,
             unix_mode=self.args.unix_mode,
             limited_doc_files=self.args.limited_doc_files,
             error_trace=self.args.error_trace,
@@ -525,30 +645,32 @@ class JsCodeStyle(object):
             disable=self.args.disable,
             max_line_length=self.args.max_line_length)
 
-        if self.args.singleprocess:
+        if self.args.cache_dir:
+            check_path_p = partial(cached_check_path,
+                                   cache_dir=self.args.cache_dir,
+                                   check_fn=check_path_p)
+
+        if single_process:
             records_iter = self._check_paths(check_path_p)
         else:
             records_iter = self._multiprocess_check_paths(check_path_p)
 
-        records_iter, records_iter_copy = tee(records_iter, 2)
-        self._print_error_records(records_iter_copy)
-
-        error_records = list(records_iter)
-        self._print_summary(self.paths, error_records)
+        error_counts, new_error_count = self._print_error_records(records_iter)
+        self._print_summary(self.paths, error_counts, new_error_count)
 
         exit_code = 0
 
         # If there are any errors
-        if error_records:
+        if error_counts:
             exit_code += 1
 
         # If there are any new errors
-        if [r for r in error_records if r.new_error]:
+        if new_error_count:
             exit_code += 2
 
         if exit_code:
             if self.args.summary:
-                self._print_file_summary(error_records)
+                self._print_file_summary(error_counts)
 
             if self.args.beep:
                 # Make a beep noise.
@@ -557,9 +679,14 @@ class JsCodeStyle(object):
             # Write out instructions for using fixjsstyle script to fix some of the
             # reported errors.
             fix_args = []
+            skip_value = False
             for flag in sys.argv[1:]:
+                if skip_value:
+                    skip_value = False
+                    continue
                 for go_flag in GJSLINT_ONLY_FLAGS:
                     if flag.startswith(go_flag):
+                        skip_value = flag in GJSLINT_ONLY_VALUE_FLAGS
                         break
                 else:
                     fix_args.append(flag)
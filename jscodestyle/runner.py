@@ -186,7 +186,7 @@ def RunMetaDataPass(start_token,
 
     try:
         metadata_pass.Process(start_token)
-    except ecmametadatapass.ParseError, parse_err:
+    except ecmametadatapass.ParseError as parse_err:
         if error_trace:
             traceback.print_exc()
         error_token = parse_err.token
@@ -319,6 +319,7 @@ class DocComment(object):
           start_token: The first token in the doc comment.
         """
         self.__flags = []
+        self.__flag_types = set()
         self.start_token = start_token
         self.end_token = None
         self.suppressions = {}
@@ -375,6 +376,7 @@ class DocComment(object):
           flag: DocFlag object.
         """
         self.__flags.append(flag)
+        self.__flag_types.add(flag.flag_type)
 
     def InheritsDocumentation(self):
         """Test if the jsdoc implies documentation inheritance.
@@ -393,10 +395,7 @@ class DocComment(object):
         Returns:
           True if the flag is set.
         """
-        for flag in self.__flags:
-            if flag.flag_type == flag_type:
-                return True
-        return False
+        return flag_type in self.__flag_types
 
     def GetFlag(self, flag_type):
         """Gets the last flag of the given type.
@@ -180,7 +180,7 @@ def SearchExcept(start_token, token_types, distance=None, reverse=False):
       None if no such token is found.
     """
     return CustomSearch(start_token,
-                        lambda token: not token.IsAnyType(token_types),
+                        lambda token: token.type not in token_types,
                         None, distance, reverse)
 
 
@@ -578,12 +578,38 @@ def GetIdentifierForToken(token):
     The function will return None if the token is not the first token of an
     identifier.
 
+    Several passes ask for the identifier of the same token, so the result is
+    cached in the token metadata.
+
     Args:
       token: The first token of a symbol.
 
     Returns:
       The whole symbol, as a string.
     """
+    metadata = token.metadata
+    if metadata is None:
+        return _GetIdentifierForToken(token)
+
+    cached_identifier = metadata.cached_identifier
+    if cached_identifier and cached_identifier[0] is token:
+        return cached_identifier[1]
+
+    identifier = _GetIdentifierForToken(token)
+    metadata.cached_identifier = (token, identifier)
+    return identifier
+
+
+def _GetIdentifierForToken(token):
+    """Get the symbol specified by a token, without using the cache.
+
+    Args:
+      token: The first token of a symbol.
+
+    Returns:
+      The whole symbol, as a string, or None if the token is not the first token
+      of an identifier.
+    """
 
     # Search backward to determine if this token is the first token of the
     # identifier. If it is not the first token, return None to signal that this
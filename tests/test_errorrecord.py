@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+#
+# Copyright 2018 The JsCodeStyle Authors.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS-IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for the errorrecord module."""
+
+
+import os
+import shutil
+import tempfile
+import unittest
+from functools import partial
+
+from jscodestyle import errorrecord
+
+
+# Paths checked by _FakeCheck. Kept out of its bound options, which are part of
+# the cache key.
+_checked_paths = []
+
+
+def _FakeCheck(path, error_string, source=None):
+    _checked_paths.append(path)
+    return [errorrecord.ErrorRecord(path, error_string, False)]
+
+
+class CachedCheckPathTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.temp_dir, 'cache')
+        self.path = os.path.join(self.temp_dir, 'foo.js')
+        self._WriteSource('var x = 1;\n')
+        del _checked_paths[:]
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _WriteSource(self, source):
+        with open(self.path, 'w') as source_file:
+            source_file.write(source)
+
+    def _Check(self, error_string='error'):
+        check_fn = partial(_FakeCheck, error_string=error_string)
+        records = errorrecord.cached_check_path(
+            self.path, self.cache_dir, check_fn)
+        return [record.error_string for record in records]
+
+    def testUnchangedFileIsNotCheckedAgain(self):
+        self.assertEquals(['error'], self._Check())
+        self.assertEquals(['error'], self._Check())
+        self.assertEquals([self.path], _checked_paths)
+
+    def testChangedFileIsCheckedAgain(self):
+        self._Check()
+        self._WriteSource('var x = 2;\n')
+        self._Check()
+        self.assertEquals([self.path, self.path], _checked_paths)
+
+    def testChangedOptionsAreCheckedAgain(self):
+        self.assertEquals(['error'], self._Check())
+        self.assertEquals(['other'], self._Check('other'))
+        self.assertEquals([self.path, self.path], _checked_paths)
+
+    def testCorruptEntryIsCheckedAgain(self):
+        self._Check()
+        for dir_path, _, file_names in os.walk(self.cache_dir):
+            for file_name in file_names:
+                with open(os.path.join(dir_path, file_name), 'wb') as entry:
+                    entry.write('(lp0\nccorrupt\nEntry\n')
+        self.assertEquals(['error'], self._Check())
+        self.assertEquals([self.path, self.path], _checked_paths)
+
+
+if __name__ == '__main__':
+    unittest.main()
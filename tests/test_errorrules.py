@@ -58,6 +58,21 @@ class ErrorRulesTest(unittest.TestCase):
 
         self._AssertErrors(original, expected)
 
+    def testMaxLineLengthCountsCharacters(self):
+        """Tests utf-8 lines are measured in characters rather than bytes.
+        """
+        # 78 characters, but well over 80 bytes.
+        original = [
+            'goog.require(\'dummy.aa\');',
+            '',
+            'function a() {',
+            '  dummy.aa.s = \'' + '\xc3\xa9' * 60 + '\';',
+            '}',
+            ''
+            ]
+
+        self._AssertErrors(original, [])
+
     def testWarningsNotDisabled(self):
         """Tests warnings are reported when nothing is disabled.
         """
@@ -78,14 +93,37 @@ class ErrorRulesTest(unittest.TestCase):
 
         self._AssertErrors(original, expected)
 
-    def _AssertErrors(self, original, expected_errors, include_header=True):
+    def testDisabledErrors(self):
+        """Tests disabled errors are not reported.
+        """
+        original = [
+            'goog.require(\'dummy.aa\');',
+            'goog.require(\'dummy.Cc\');',
+            'goog.require(\'dummy.Dd\');',
+            '',
+            'function a() {',
+            '  dummy.aa.i = 1;',
+            '  dummy.Cc.i = 1;',
+            '  dummy.Dd.i = 1;',
+            '}',
+            ]
+
+        expected = [errors.FILE_MISSING_NEWLINE]
+
+        self._AssertErrors(original, expected, disable=['0140', 'foo'])
+
+    def _AssertErrors(self, original, expected_errors, include_header=True,
+                      **kwargs):
         """Asserts that the error fixer corrects original to expected."""
         if include_header:
             original = self._GetHeader() + original
 
+        run_kwargs = dict(KWARGS, **kwargs)
+
         # Trap gjslint's output parse it to get messages added.
         error_accumulator = erroraccumulator.ErrorAccumulator()
-        runner.Run('testing.js', error_accumulator, source=original, **KWARGS)
+        runner.Run('testing.js', error_accumulator, source=original,
+                   **run_kwargs)
         error_nums = [e.code for e in error_accumulator.GetErrors()]
 
         error_nums.sort()
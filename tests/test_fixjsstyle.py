@@ -464,6 +464,30 @@ class FixJsStyleTest(unittest.TestCase):
 
         self._AssertFixes(original, expected)
 
+    def testNoProvideAddedForFixedStatement(self):
+        """Tests that provides are computed from the tokens before fixing.
+
+        Fixing the missing semicolon after xxx must not lead to a goog.provide
+        being added for the constructor that follows it.
+        """
+        original = [
+            'xxx',
+            '',
+            '/** @constructor */',
+            'dummy.Something = function() {};',
+            ]
+
+        expected = [
+            'xxx;',
+            '',
+            '',
+            '',
+            '/** @constructor */',
+            'dummy.Something = function() {};',
+            ]
+
+        self._AssertFixes(original, expected)
+
     def testOutputOkayWhenFirstTokenIsDeleted(self):
         """Tests that autofix output is is correct when first token is deleted.
 
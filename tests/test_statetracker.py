@@ -68,6 +68,14 @@ class DocCommentTest(unittest.TestCase):
             [a, b, c],
             comment.GetDocFlags())
 
+    def testHasFlag(self):
+        comment = statetracker.DocComment(None)
+
+        self.assertFalse(comment.HasFlag('private'))
+        comment.AddFlag(self._MakeDocFlagFake('private'))
+        self.assertTrue(comment.HasFlag('private'))
+        self.assertFalse(comment.HasFlag('override'))
+
     def testInvalidate(self):
         comment = statetracker.DocComment(None)
 
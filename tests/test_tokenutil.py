@@ -16,6 +16,7 @@
 
 """Unit tests for the scopeutil module."""
 
+import copy
 import unittest
 
 from jscodestyle import ecmametadatapass
@@ -288,6 +289,24 @@ class TokenUtilTest(unittest.TestCase):
         self.assertIsNone(
             tokenutil.GetIdentifierForToken(_GetTokenStartingWith('middle1')))
 
+    def testGetIdentifierForTokenCopiedMetadata(self):
+
+        start_token = testutil.TokenizeSourceAndRunEcmaPass('start1.abc;')
+
+        self.assertEquals('start1.abc',
+                          tokenutil.GetIdentifierForToken(start_token))
+
+        # A token taking the place of start_token with a copy of its metadata
+        # must not reuse the identifier cached for start_token.
+        new_token = javascripttokens.JavaScriptToken(
+            'start2.def', javascripttokens.JavaScriptTokenType.IDENTIFIER,
+            start_token.line, start_token.line_number)
+        new_token.metadata = copy.copy(start_token.metadata)
+        new_token.next = start_token.next
+
+        self.assertEquals('start2.def',
+                          tokenutil.GetIdentifierForToken(new_token))
+
 
 if __name__ == '__main__':
     unittest.main()